@@ -1,29 +1,187 @@
+import os
 import sys
+import json
 import time
 import random
+from concurrent.futures import ProcessPoolExecutor, wait
+from array import array
+from bisect import bisect_left, insort
+from heapq import heappush, heappop, nsmallest
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:  # NumPy jest opcjonalny (backend "numpy")
+    np = None
+
+class SetupMatrix(list):
+    """
+    Macierz przezbrojeń n×n w jednym płaskim buforze int32
+    (array('i') albo tablica NumPy). Lista przechowuje tylko widoki
+    wierszy (memoryview), więc S[a][b] działa tak samo jak dla listy list.
+    """
+    
+    # Tablice pomocnicze (SetupTables), ustawiane przez precompute_setups
+    tables = None
+    
+    def __init__(self, n, data):
+        view = memoryview(data)
+        super().__init__(view[a * n:(a + 1) * n] for a in range(n))
+        self.n = n
+        self.data = data
+    
+    def __array__(self, dtype=None, copy=None):
+        matrix = np.frombuffer(self.data, dtype=np.int32).reshape(self.n, self.n)
+        return matrix if dtype is None else matrix.astype(dtype)
+
+# Długość posortowanych list następników i poprzedników w SetupTables
+SETUP_SORTED_K = 32
+# Do jakiego n sprawdzamy nierówność trójkąta (O(n^3)) z NumPy i bez
+TRIANGLE_MAX_N = 600
+TRIANGLE_PYTHON_MAX_N = 80
+# Ile elementów macierzy przezbrojeń przetwarzamy naraz w NumPy
+SETUP_BLOCK = 1 << 20
+
+class SetupTables:
+    """
+    Tablice liczone raz dla macierzy przezbrojeń (zadania od 0):
+    min_in / min_out - najtańsze przezbrojenie wejściowe / wyjściowe,
+    succ / pred - SETUP_SORTED_K najtańszych następników / poprzedników,
+    zero_next / zero_prev - łańcuchy zerowych przezbrojeń (rozłączne
+    ścieżki, -1 na końcach), triangle - czy S spełnia nierówność trójkąta
+    (dla dużych n sprawdzana nie jest i wynosi False).
+    """
+    
+    def __init__(self, S):
+        n = len(S)
+        k = min(SETUP_SORTED_K, n - 1)
+        if n <= 1:
+            self.min_in = self.min_out = [0] * n
+            self.succ, self.pred = build_candidate_lists(S, k)
+        elif np is not None:
+            self.min_out, self.succ = smallest_in_rows(S, k)
+            self.min_in, self.pred = smallest_in_rows(S, k, transpose=True)
+        else:
+            self.min_in = [min(S[i][j] for i in range(n) if i != j) for j in range(n)]
+            self.min_out = [min(S[i][j] for j in range(n) if i != j) for i in range(n)]
+            self.succ, self.pred = build_candidate_lists(S, k)
+        
+        self.zero_next, self.zero_prev = zero_setup_chains(S, self.succ)
+        self.triangle = satisfies_triangle(S)
+
+def smallest_in_rows(S, k, transpose=False):
+    """
+    Dla każdego wiersza S (przy transpose: kolumny) bez przekątnej:
+    minimum i k indeksów najmniejszych wartości, rosnąco. Liczone w NumPy
+    blokami po SETUP_BLOCK elementów widoku bufora int32, więc nie
+    powstaje kopia całej macierzy. Zwraca (minima, listy indeksów).
+    """
+    matrix = np.asarray(S)
+    n = len(matrix)
+    rows = max(1, SETUP_BLOCK // n)
+    minima = np.empty(n, dtype=np.int64)
+    smallest = np.empty((n, k), dtype=np.int64)
+    
+    for a in range(0, n, rows):
+        b = min(n, a + rows)
+        block = (matrix[:, a:b].T if transpose else matrix[a:b]).astype(np.int64)
+        block[np.arange(b - a), np.arange(a, b)] = np.iinfo(np.int64).max
+        minima[a:b] = block.min(axis=1)
+        if k > 0:
+            part = np.argpartition(block, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(block, part, axis=1), axis=1)
+            smallest[a:b] = np.take_along_axis(part, order, axis=1)
+    
+    return minima.tolist(), smallest.tolist()
+
+def zero_setup_chains(S, succ):
+    """
+    Zachłanne pokrycie grafu zerowych przezbrojeń rozłącznymi ścieżkami.
+    succ to posortowane listy następników, więc zerowe są na ich początku.
+    Zwraca (zero_next, zero_prev) z -1 tam, gdzie łańcuch się kończy.
+    """
+    n = len(S)
+    zero_next = [-1] * n
+    zero_prev = [-1] * n
+    # head[koniec łańcucha] = jego początek, by nie zamknąć cyklu
+    head = list(range(n))
+    for a in range(n):
+        row = S[a]
+        for b in succ[a]:
+            if row[b] != 0:
+                break
+            if zero_prev[b] < 0 and head[a] != b:
+                zero_next[a], zero_prev[b] = b, a
+                tail = b
+                while zero_next[tail] >= 0:
+                    tail = zero_next[tail]
+                head[tail] = head[a]
+                break
+    return zero_next, zero_prev
+
+def satisfies_triangle(S):
+    """
+    Czy S[i][j] <= S[i][k] + S[k][j] dla wszystkich i, j, k. Koszt O(n^3),
+    więc powyżej TRIANGLE_MAX_N (bez NumPy TRIANGLE_PYTHON_MAX_N) zwraca
+    False; kończy przy pierwszym naruszeniu.
+    """
+    n = len(S)
+    if np is not None and n <= TRIANGLE_MAX_N:
+        matrix = np.array(S, dtype=np.int64)
+        np.fill_diagonal(matrix, 0)
+        for k in range(n):
+            if (matrix[:, k, None] + matrix[None, k, :] < matrix).any():
+                return False
+        return True
+    if n > TRIANGLE_PYTHON_MAX_N:
+        return False
+    for k in range(n):
+        row_k = S[k]
+        for i in range(n):
+            s_ik = S[i][k] if i != k else 0
+            row_i = S[i]
+            for j in range(n):
+                if i != j and s_ik + (row_k[j] if j != k else 0) < row_i[j]:
+                    return False
+    return True
+
+def precompute_setups(S):
+    """Liczy SetupTables dla macierzy i zapamiętuje je w S.tables"""
+    S.tables = SetupTables(S)
+    return S.tables
 
 def read_instance(filename):
     """Wczytuje plik z instancją"""
+    if np is not None:
+        # Jeden odczyt i parsowanie całego pliku w C
+        values = np.fromfile(filename, dtype=np.int32, sep=' ')
+        n = int(values[0])
+        p = values[1:2 * n + 1:2].tolist()
+        d = values[2:2 * n + 2:2].tolist()
+        S = SetupMatrix(n, values[2 * n + 1:2 * n + 1 + n * n])
+        return n, p, d, S
+    
     with open(filename, 'r') as f:
-        lines = f.readlines()
+        data = f.read()
     
-    n = int(lines[0].strip())
+    lines = data.split('\n', 1)
+    n = int(lines[0])
+    lines = lines[1].split('\n', n)
     
     # Wczytaj czasy wykonania i terminy (deadline'y)
     p = []
     d = []
-    for i in range(1, n + 1):
-        parts = lines[i].strip().split()
+    for i in range(n):
+        parts = lines[i].split()
         p.append(int(parts[0]))
         d.append(int(parts[1]))
     
-    # Wczytaj macierz przezbrojeń
-    S = []
-    for i in range(n + 1, 2 * n + 1):
-        row = list(map(int, lines[i].strip().split()))
-        S.append(row)
+    # Wczytaj macierz przezbrojeń do płaskiego bufora, wiersz po wierszu
+    buffer = array('i')
+    for line in lines[n].split('\n', n - 1)[:n]:
+        buffer.extend(map(int, line.split()))
     
-    return n, p, d, S
+    return n, p, d, SetupMatrix(n, buffer)
 
 def calculate_tardy_jobs(sequence, p, d, S):
     """
@@ -51,6 +209,341 @@ def calculate_tardy_jobs(sequence, p, d, S):
     
     return tardy_count
 
+def compute_prefix(sequence, p, d, S):
+    """
+    Oblicza prefiksowe czasy zakończenia i prefiksowe liczby spóźnień
+    C[k]: czas zakończenia zadania na pozycji k
+    T[k]: liczba spóźnionych zadań na pozycjach 0..k
+    """
+    C = []
+    T = []
+    current_time = 0
+    tardy_count = 0
+    prev_job = -1
+    
+    for job_id in sequence:
+        job = job_id - 1
+        if prev_job >= 0:
+            current_time += S[prev_job][job]
+        current_time += p[job]
+        if current_time > d[job]:
+            tardy_count += 1
+        C.append(current_time)
+        T.append(tardy_count)
+        prev_job = job
+    
+    return C, T
+
+def compute_slack(sequence, C, d):
+    """Luz czasowy d - C każdej pozycji sekwencji (ujemna dla spóźnionych)"""
+    return [d[job_id - 1] - C[k] for k, job_id in enumerate(sequence)]
+
+def count_shifted_tardy(L, lo, hi, shift):
+    """Liczba spóźnionych na pozycjach lo..hi-1 po przesunięciu czasów o shift"""
+    count = 0
+    for slack in L[lo:hi]:
+        if slack < shift:
+            count += 1
+    return count
+
+def evaluate_swap(sequence, C, T, L, i, j, p, d, S, limit):
+    """
+    Liczba spóźnień po zamianie pozycji i < j, liczona w O(1) poza
+    przesuniętymi blokami. Zadania między i a j oraz za j przesuwają się
+    o stałe delta1 i delta2, więc ich spóźnienia wynikają z luzów L.
+    Zwraca dokładny wynik, jeśli jest mniejszy niż limit,
+    w przeciwnym razie dowolną wartość >= limit.
+    """
+    n = len(sequence)
+    x = sequence[i] - 1
+    y = sequence[j] - 1
+    
+    # Zadanie y na pozycji i
+    if i > 0:
+        t = C[i - 1] + S[sequence[i - 1] - 1][y] + p[y]
+        tardy_count = T[i - 1]
+    else:
+        t = p[y]
+        tardy_count = 0
+    if t > d[y]:
+        tardy_count += 1
+    
+    # Blok i+1..j-1 przesuwa się o delta1
+    if j > i + 1:
+        b = sequence[i + 1] - 1
+        delta1 = t + S[y][b] + p[b] - C[i + 1]
+        t = C[j - 1] + delta1 + S[sequence[j - 1] - 1][x] + p[x]
+    else:
+        delta1 = 0
+        t += S[y][x] + p[x]
+    
+    # Zadanie x na pozycji j
+    if t > d[x]:
+        tardy_count += 1
+    
+    # Sufiks j+1..n-1 przesuwa się o delta2
+    if j + 1 < n:
+        c = sequence[j + 1] - 1
+        delta2 = t + S[x][c] + p[c] - C[j + 1]
+    else:
+        delta2 = 0
+    
+    mid_old = T[j - 1] - T[i]
+    suffix_old = T[-1] - T[j]
+    
+    # Dolne ograniczenie: przesunięcie w prawo nie zmniejsza spóźnień
+    lower_bound = tardy_count
+    if delta1 >= 0:
+        lower_bound += mid_old
+    if delta2 >= 0:
+        lower_bound += suffix_old
+    if lower_bound >= limit:
+        return lower_bound
+    
+    if delta1 == 0:
+        tardy_count += mid_old
+    else:
+        tardy_count += count_shifted_tardy(L, i + 1, j, delta1)
+        if delta2 >= 0 and tardy_count + suffix_old >= limit:
+            return tardy_count + suffix_old
+    
+    if delta2 == 0:
+        tardy_count += suffix_old
+    else:
+        tardy_count += count_shifted_tardy(L, j + 1, n, delta2)
+    
+    return tardy_count
+
+def shifted_block_tardy(T, L, lo, hi, shift):
+    """Liczba spóźnionych na pozycjach lo..hi-1 po przesunięciu czasów o shift"""
+    if lo >= hi:
+        return 0
+    if shift == 0:
+        return T[hi - 1] - (T[lo - 1] if lo > 0 else 0)
+    return count_shifted_tardy(L, lo, hi, shift)
+
+def evaluate_relocation(sequence, C, T, L, i, j, p, d, S, limit):
+    """
+    Liczba spóźnień po przesunięciu zadania z pozycji i na pozycję j
+    (jak pop(i) + insert(j)), liczona jak w evaluate_swap: przesunięte
+    bloki oceniamy z luzów L, a przed skanowaniem sprawdzamy dolne
+    ograniczenie. Zwraca dokładny wynik, jeśli jest mniejszy niż limit,
+    w przeciwnym razie dowolną wartość >= limit.
+    """
+    n = len(sequence)
+    x = sequence[i] - 1
+    
+    if j > i:
+        # Blok i+1..j przesuwa się o delta1, x trafia za sequence[j]
+        b = sequence[i + 1] - 1
+        if i > 0:
+            delta1 = C[i - 1] + S[sequence[i - 1] - 1][b] + p[b] - C[i + 1]
+            tardy_count = T[i - 1]
+        else:
+            delta1 = p[b] - C[i + 1]
+            tardy_count = 0
+        block = (i + 1, j + 1)
+        t = C[j] + delta1 + S[sequence[j] - 1][x] + p[x]
+        after_x = j + 1
+    else:
+        # x trafia przed sequence[j], blok j..i-1 przesuwa się o delta1
+        if j > 0:
+            t = C[j - 1] + S[sequence[j - 1] - 1][x] + p[x]
+            tardy_count = T[j - 1]
+        else:
+            t = p[x]
+            tardy_count = 0
+        a = sequence[j] - 1
+        delta1 = t + S[x][a] + p[a] - C[j]
+        block = (j, i)
+        after_x = None
+    
+    if t > d[x]:
+        tardy_count += 1
+    
+    # Sufiks przesuwa się o delta2
+    if after_x is not None:
+        suffix = after_x
+        if suffix < n:
+            c = sequence[suffix] - 1
+            delta2 = t + S[x][c] + p[c] - C[suffix]
+        else:
+            delta2 = 0
+    else:
+        suffix = i + 1
+        if suffix < n:
+            c = sequence[suffix] - 1
+            delta2 = C[i - 1] + delta1 + S[sequence[i - 1] - 1][c] + p[c] - C[suffix]
+        else:
+            delta2 = 0
+    
+    # Dolne ograniczenie: przesunięcie w prawo nie zmniejsza spóźnień
+    lower_bound = tardy_count
+    if delta1 >= 0:
+        lower_bound += shifted_block_tardy(T, L, block[0], block[1], 0)
+    if delta2 >= 0:
+        lower_bound += T[-1] - T[suffix - 1]
+    if lower_bound >= limit:
+        return lower_bound
+    
+    tardy_count += shifted_block_tardy(T, L, block[0], block[1], delta1)
+    tardy_count += shifted_block_tardy(T, L, suffix, n, delta2)
+    return tardy_count
+
+def evaluate_insertions(sequence, i, p, d, S):
+    """
+    Liczby spóźnień dla przesunięcia zadania z pozycji i na każdą pozycję j
+    (jak pop(i) + insert(j)). Zadanie usuwamy raz, a wstawienie między a i b
+    przesuwa sufiks o S[a][x] + p[x] + S[x][b] - S[a][b], więc spóźnienia
+    sufiksu liczymy z posortowanych luzów w jednym przebiegu od końca.
+    insort kosztuje O(n) (przesunięcie listy), więc zadanie to O(n^2)
+    w najgorszym razie; przesunięcie robi memmove, więc do n=5000 jest to
+    szybsze niż drzewo Fenwicka o koszcie O(n log n) w Pythonie.
+    """
+    x = sequence[i] - 1
+    reduced = sequence[:i] + sequence[i + 1:]
+    m = len(reduced)
+    C, T = compute_prefix(reduced, p, d, S)
+    L = compute_slack(reduced, C, d)
+    p_x = p[x]
+    d_x = d[x]
+    row_x = S[x]
+    
+    scores = [0] * (m + 1)
+    suffix_slacks = []
+    
+    for j in range(m, -1, -1):
+        if j > 0:
+            a = reduced[j - 1] - 1
+            row_a = S[a]
+            t = C[j - 1] + row_a[x] + p_x
+            tardy_count = T[j - 1]
+            if j < m:
+                b = reduced[j] - 1
+                delta = t + row_x[b] - C[j - 1] - row_a[b]
+            else:
+                delta = 0
+        else:
+            t = p_x
+            tardy_count = 0
+            delta = t + row_x[reduced[0] - 1] if m > 0 else 0
+        
+        if t > d_x:
+            tardy_count += 1
+        
+        # Sufiks j..m-1 przesuwa się o delta
+        if j < m:
+            insort(suffix_slacks, L[j])
+            tardy_count += bisect_left(suffix_slacks, delta)
+        
+        scores[j] = tardy_count
+    
+    return scores
+
+class BatchEvaluator:
+    """
+    Blokowa ocena ruchów w NumPy: p, d i S trzymane jako tablice int64.
+    Czasy zakończenia liczone są sumami skumulowanymi, a spóźnienia całych
+    bloków kandydatów jednym wektorowym porównaniem luzów z przesunięciami.
+    """
+    
+    # Maksymalna liczba elementów macierzy porównań w jednym bloku
+    block_size = 1 << 20
+    
+    def __init__(self, p, d, S):
+        self.p = np.asarray(p, dtype=np.int64)
+        self.d = np.asarray(d, dtype=np.int64)
+        self.S = np.asarray(S, dtype=np.int64)
+    
+    def prefix(self, sequence):
+        """Zadania (od 0), czasy zakończenia, prefiksowe spóźnienia i luzy"""
+        jobs = np.asarray(sequence, dtype=np.int64) - 1
+        durations = self.p[jobs]
+        durations[1:] += self.S[jobs[:-1], jobs[1:]]
+        C = np.cumsum(durations)
+        L = self.d[jobs] - C
+        T = np.cumsum(L < 0)
+        return jobs, C, T, L
+    
+    def _count_shifted(self, scores, L, lo, before, after, split):
+        """
+        Dodaje do scores[r] liczbę pozycji k >= lo z L[k] < próg, gdzie
+        próg to before[r] dla k < split[r] i after[r] dla k > split[r]
+        (pozycja split[r] jest pomijana)
+        """
+        slacks = L[lo:]
+        positions = np.arange(lo, lo + len(slacks))
+        rows = max(1, self.block_size // max(1, len(slacks)))
+        
+        for start in range(0, len(scores), rows):
+            block = slice(start, start + rows)
+            pivot = split[block, None]
+            threshold = np.where(positions < pivot, before[block, None], after[block, None])
+            hits = (slacks < threshold) & (positions != pivot)
+            scores[block] += hits.sum(axis=1)
+    
+    def swap_scores(self, state, i, j_start):
+        """Liczby spóźnień po zamianie pozycji i z każdą pozycją j >= j_start"""
+        jobs, C, T, L = state
+        p, d, S = self.p, self.d, self.S
+        n = len(jobs)
+        x = jobs[i]
+        js = np.arange(j_start, n)
+        y = jobs[js]
+        
+        # Zadania y na pozycji i
+        if i > 0:
+            t_y = C[i - 1] + S[jobs[i - 1], y] + p[y]
+            scores = T[i - 1] + (t_y > d[y])
+        else:
+            t_y = p[y]
+            scores = (t_y > d[y]).astype(np.int64)
+        
+        # Blok i+1..j-1 przesuwa się o delta1, zadanie x trafia na pozycję j
+        b = jobs[i + 1]
+        delta1 = t_y + S[y, b] + p[b] - C[i + 1]
+        t_x = np.where(
+            js > i + 1,
+            C[js - 1] + delta1 + S[jobs[js - 1], x] + p[x],
+            t_y + S[y, x] + p[x]
+        )
+        scores += t_x > d[x]
+        
+        # Sufiks j+1..n-1 przesuwa się o delta2
+        nxt = np.minimum(js + 1, n - 1)
+        c = jobs[nxt]
+        delta2 = np.where(js + 1 < n, t_x + S[x, c] + p[c] - C[nxt], 0)
+        
+        self._count_shifted(scores, L, i + 1, delta1, delta2, js)
+        return scores
+    
+    def insertion_scores(self, sequence, i):
+        """Liczby spóźnień dla przesunięcia zadania z pozycji i na każdą pozycję j"""
+        p, d, S = self.p, self.d, self.S
+        x = sequence[i] - 1
+        jobs, C, T, L = self.prefix(sequence[:i] + sequence[i + 1:])
+        m = len(jobs)
+        if m == 0:
+            return np.array([int(p[x] > d[x])])
+        
+        # Czas zakończenia x wstawionego na pozycję j
+        t = np.empty(m + 1, dtype=np.int64)
+        t[0] = p[x]
+        t[1:] = C + S[jobs, x] + p[x]
+        scores = np.zeros(m + 1, dtype=np.int64)
+        scores[1:] = T
+        scores += t > d[x]
+        
+        # Sufiks j..m-1 przesuwa się o delta
+        delta = np.zeros(m + 1, dtype=np.int64)
+        delta[0] = t[0] + S[x, jobs[0]]
+        delta[1:m] = t[1:m] + S[x, jobs[1:]] - C[:-1] - S[jobs[:-1], jobs[1:]]
+        
+        # Pozycje k < j nie zmieniają się, liczymy tylko k >= j
+        unchanged = np.full(m + 1, np.iinfo(np.int64).min)
+        self._count_shifted(scores, L, 0, unchanged, delta, np.arange(-1, m))
+        return scores
+
 def edd_heuristic(n, p, d):
     """Algorytm zachłanny: sortowanie według terminów (EDD - Earliest Due Date)"""
     jobs = list(range(1, n + 1))
@@ -58,10 +551,365 @@ def edd_heuristic(n, p, d):
     jobs.sort(key=lambda j: d[j-1])
     return jobs
 
-def local_search_2opt(sequence, p, d, S, time_limit, start_time):
-    """Przeszukiwanie lokalne z zamianami 2-opt"""
+def randomized_edd(n, p, d, rng):
+    """EDD z terminami zaburzonymi losowo o co najwyżej średni czas wykonania"""
+    noise = sum(p) / n
+    keys = [d[j] + rng.uniform(-noise, noise) for j in range(n)]
+    jobs = list(range(1, n + 1))
+    jobs.sort(key=lambda j: keys[j-1])
+    return jobs
+
+def setup_moore_hodgson(n, p, d, S):
+    """
+    Moore-Hodgson z przezbrojeniami: zadania w kolejności EDD dopisujemy
+    na koniec, a gdy ostatnie się spóźnia, usuwamy zadanie, którego
+    usunięcie oszczędza najwięcej czasu (p oraz zmiana przezbrojeń).
+    Sekwencja to lista dwukierunkowa, kandydaci do usunięcia leżą w kopcu
+    z leniwym unieważnianiem, więc całość to O(n log n).
+    """
+    prev = [-1] * n
+    nxt = [-1] * n
+    version = [0] * n
+    in_sequence = [False] * n
+    heap = []
+    
+    def saving(job):
+        """Czas zaoszczędzony przez usunięcie zadania z sekwencji"""
+        a = prev[job]
+        b = nxt[job]
+        value = p[job]
+        if a >= 0:
+            value += S[a][job]
+        if b >= 0:
+            value += S[job][b]
+            if a >= 0:
+                value -= S[a][b]
+        return value
+    
+    def push(job):
+        version[job] += 1
+        heappush(heap, (-saving(job), version[job], job))
+    
+    head = -1
+    last = -1
+    current_time = 0
+    rejected = []
+    
+    for job_id in edd_heuristic(n, p, d):
+        job = job_id - 1
+        
+        # Dopisz zadanie na koniec sekwencji
+        if last >= 0:
+            current_time += S[last][job]
+            nxt[last] = job
+        else:
+            head = job
+        current_time += p[job]
+        prev[job] = last
+        in_sequence[job] = True
+        push(job)
+        if last >= 0:
+            push(last)
+        last = job
+        
+        # Usuwaj zadania o największej oszczędności, aż ostatnie zdąży
+        while last >= 0 and current_time > d[last]:
+            neg_saving, stamp, k = heappop(heap)
+            if not in_sequence[k] or stamp != version[k]:
+                continue
+            
+            current_time += neg_saving
+            in_sequence[k] = False
+            rejected.append(k + 1)
+            
+            a = prev[k]
+            b = nxt[k]
+            if a >= 0:
+                nxt[a] = b
+            else:
+                head = b
+            if b >= 0:
+                prev[b] = a
+            else:
+                last = a
+            
+            # Oszczędności sąsiadów się zmieniły
+            if a >= 0:
+                push(a)
+            if b >= 0:
+                push(b)
+    
+    on_time = []
+    job = head
+    while job >= 0:
+        on_time.append(job + 1)
+        job = nxt[job]
+    
+    return join_partition(on_time, rejected, d)
+
+# Parametry konstrukcji wiązkowej (beam search)
+BEAM_WIDTH = 8
+BEAM_BRANCH = 4
+BEAM_MAX_WIDTH = 64
+BEAM_TIME_FRACTION = 0.1
+BEAM_SECONDS_PER_STEP = 2e-7  # zmierzony czas na jednostkę w * branch * n^2
+
+def beam_width_for(n, time_limit, branch=BEAM_BRANCH):
+    """Szerokość wiązki, przy której konstrukcja zajmie ok. BEAM_TIME_FRACTION limitu"""
+    steps = branch * n * n * BEAM_SECONDS_PER_STEP
+    width = int(time_limit * BEAM_TIME_FRACTION / steps) if steps > 0 else BEAM_MAX_WIDTH
+    return max(1, min(BEAM_MAX_WIDTH, width))
+
+def beam_search(n, p, d, S, width=BEAM_WIDTH, branch=BEAM_BRANCH, deadline=None):
+    """
+    Konstrukcja wiązkowa części terminowej. Stan: (czas, ostatnie zadanie,
+    liczba terminowych, maska zaplanowanych). Następniki to pierwsze
+    branch zadań w kolejności EDD, które zdążą przed terminem (po
+    przezbrojeniu z ostatniego zadania). Stany oceniamy liczbą
+    terminowych plus liczbą pozostałych zadań, które jeszcze mogą zdążyć
+    przy najtańszym przezbrojeniu, a z równą oceną wcześniejszym czasem.
+    Z tym samym ostatnim zadaniem zostaje tylko najlepszy stan. Koszt O(width * branch * n^2); po terminie deadline
+    konstrukcja kończy się najlepszym dotąd łańcuchem, a resztę zadań
+    dokłada join_partition.
+    """
+    min_in = min_incoming_setups(S)
+    latest = [d[j] - p[j] - min_in[j] for j in range(n)]
+    edd_jobs = sorted(range(n), key=lambda j: d[j])
+    
+    # Stan: (ocena, czas, ostatnie, maska, wpis łańcucha (zadanie, poprzedni))
+    beam = [(0, 0, -1, 0, None)]
+    best = beam[0]
+    
+    while beam:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        
+        children = {}
+        for _, t, last, mask, chain_entry in beam:
+            successors = []
+            for j in edd_jobs:
+                # latest odrzuca w O(1) zadania, które nie zdążą nawet
+                # z najtańszym przezbrojeniem
+                if mask >> j & 1 or (last >= 0 and t > latest[j]):
+                    continue
+                c = t + (S[last][j] if last >= 0 else 0) + p[j]
+                if c <= d[j]:
+                    successors.append((c, j))
+                    if len(successors) == branch:
+                        break
+            
+            for c, j in successors:
+                child_mask = mask | 1 << j
+                # Ile pozostałych zadań może jeszcze zdążyć
+                potential = sum(1 for k in edd_jobs if not child_mask >> k & 1 and c <= latest[k])
+                child = (-potential, c, j, child_mask, (j, chain_entry))
+                
+                # Dominacja: jeden stan na ostatnie zadanie
+                old = children.get(j)
+                if old is None or child[:2] < old[:2]:
+                    children[j] = child
+        
+        beam = nsmallest(width, children.values(), key=lambda state: state[:2])
+        if beam:
+            best = beam[0]
+    
+    on_time = []
+    chain_entry = best[4]
+    while chain_entry is not None:
+        on_time.append(chain_entry[0] + 1)
+        chain_entry = chain_entry[1]
+    on_time.reverse()
+    
+    scheduled = set(on_time)
+    return join_partition(on_time, [j for j in range(1, n + 1) if j not in scheduled], d)
+
+# Domyślna długość list kandydatów i rozmiar, od którego są włączane
+CANDIDATE_K = 8
+CANDIDATE_MIN_N = 1000
+
+def build_candidate_lists(S, k):
+    """
+    Listy k najtańszych następników i poprzedników każdego zadania
+    (numeracja od 0) według macierzy przezbrojeń. Z tablicami S.tables
+    są to ich prefiksy, uzupełnione o sąsiadów z łańcuchów zerowych
+    przezbrojeń.
+    """
+    n = len(S)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)], [[] for _ in range(n)]
+    
+    tables = getattr(S, "tables", None)
+    if tables is not None and k <= SETUP_SORTED_K:
+        succ = [row[:k] for row in tables.succ]
+        pred = [row[:k] for row in tables.pred]
+        for a in range(n):
+            b = tables.zero_next[a]
+            if b >= 0 and b not in succ[a]:
+                succ[a].append(b)
+            b = tables.zero_prev[a]
+            if b >= 0 and b not in pred[a]:
+                pred[a].append(b)
+        return succ, pred
+    
+    if np is not None:
+        return smallest_in_rows(S, k)[1], smallest_in_rows(S, k, transpose=True)[1]
+    
+    succ = []
+    pred = []
+    for a in range(n):
+        row = S[a]
+        others = [b for b in range(n) if b != a]
+        succ.append(nsmallest(k, others, key=row.__getitem__))
+        pred.append(nsmallest(k, others, key=lambda b: S[b][a]))
+    return succ, pred
+
+def job_positions(sequence):
+    """position[zadanie od 0] = indeks w sekwencji"""
+    position = [0] * len(sequence)
+    for k, job_id in enumerate(sequence):
+        position[job_id - 1] = k
+    return position
+
+def swap_candidates(sequence, position, i, candidates):
+    """
+    Pozycje j > i, dla których zamiana (i, j) tworzy co najmniej jedno
+    tanie sąsiedztwo z list kandydatów
+    """
+    succ, pred = candidates
+    n = len(sequence)
+    x = sequence[i] - 1
+    js = set()
+    
+    # Zadanie y na pozycji i: tanie po sequence[i-1] lub przed sequence[i+1]
+    if i > 0:
+        js.update(position[y] for y in succ[sequence[i - 1] - 1])
+    js.update(position[y] for y in pred[sequence[i + 1] - 1])
+    
+    # Zadanie x na pozycji j: tanie po sequence[j-1] lub przed sequence[j+1]
+    js.update(position[a] + 1 for a in pred[x])
+    js.update(position[b] - 1 for b in succ[x])
+    
+    return sorted(j for j in js if i < j < n)
+
+def insertion_candidates(sequence, position, i, candidates):
+    """
+    Pozycje j (jak pop(i) + insert(j)), na których zadanie z pozycji i
+    staje za tanim poprzednikiem lub przed tanim następnikiem
+    """
+    succ, pred = candidates
+    x = sequence[i] - 1
+    js = set()
+    
+    for a in pred[x]:
+        q = position[a]
+        js.add(q + 1 if q < i else q)
+    for b in succ[x]:
+        q = position[b]
+        js.add(q if q < i else q - 1)
+    
+    js.discard(i)
+    return sorted(js)
+
+def record_phase(stats, name, started, evaluated, accepted, end):
+    """
+    Dopisuje do stats (jeśli podano) podsumowanie fazy: czas, liczbę
+    ocenionych i przyjętych ruchów oraz powód zakończenia ("local_optimum",
+    "iteration_cap", "time_limit", "lower_bound", "complete"). Fazy liczą ruchy
+    w zmiennych lokalnych i wołają to raz, na końcu.
+    """
+    if stats is None:
+        return
+    seconds = time.monotonic() - started
+    stats.setdefault("phases", []).append({
+        "phase": name,
+        "seconds": round(seconds, 4),
+        "evaluated": evaluated,
+        "accepted": accepted,
+        "moves_per_second": round(evaluated / seconds) if seconds > 0 else None,
+        "end": end,
+    })
+
+def record_best(stats, tardy_count):
+    """Dopisuje punkt (czas, najlepszy wynik) do przebiegu w stats, jeśli wynik się poprawił"""
+    if stats is None:
+        return
+    timeline = stats.setdefault("timeline", [])
+    if not timeline or tardy_count < timeline[-1][1]:
+        timeline.append((time.monotonic(), tardy_count))
+
+def summarize_stats(stats, start_time):
+    """
+    Statystyki gotowe do zapisu w JSON: czasy przebiegu względem
+    start_time (przebiegi procesów portfela złączone w jeden, malejący)
+    oraz suma faz dla każdego sąsiedztwa.
+    """
+    summary = dict(stats)
+    summary["timeline"] = []
+    for moment, tardy_count in sorted(stats.get("timeline", [])):
+        if not summary["timeline"] or tardy_count < summary["timeline"][-1][1]:
+            summary["timeline"].append([round(moment - start_time, 4), tardy_count])
+    neighbourhoods = {}
+    for phase in stats.get("phases", []):
+        total = neighbourhoods.setdefault(phase["phase"], {
+            "runs": 0, "seconds": 0.0, "evaluated": 0, "accepted": 0, "ends": {}
+        })
+        total["runs"] += 1
+        total["seconds"] = round(total["seconds"] + phase["seconds"], 4)
+        total["evaluated"] += phase["evaluated"]
+        total["accepted"] += phase["accepted"]
+        total["ends"][phase["end"]] = total["ends"].get(phase["end"], 0) + 1
+    for total in neighbourhoods.values():
+        seconds = total["seconds"]
+        total["moves_per_second"] = round(total["evaluated"] / seconds) if seconds > 0 else None
+    summary["neighbourhoods"] = neighbourhoods
+    return summary
+
+def phase_end(improved, iterations, max_iterations, best_tardy, lower_bound):
+    """Powód zakończenia pętli zejścia z limitem iteracji"""
+    if best_tardy <= lower_bound:
+        return "lower_bound"
+    if not improved:
+        return "local_optimum"
+    if iterations >= max_iterations:
+        return "iteration_cap"
+    return "time_limit"
+
+def make_evaluator(backend, p, d, S):
+    """Zwraca BatchEvaluator dla backendu "numpy" (gdy NumPy jest dostępny)"""
+    if backend == "numpy" and np is not None:
+        return BatchEvaluator(p, d, S)
+    return None
+
+def local_search_2opt(sequence, p, d, S, deadline, backend="python",
+                      candidates=None, lower_bound=0, stats=None):
+    """
+    Przeszukiwanie lokalne z zamianami 2-opt.
+    Z listami kandydatów (build_candidate_lists) przegląda tylko zamiany
+    tworzące tanie sąsiedztwo, a pełne sąsiedztwo dopiero gdy te się wyczerpią.
+    Kończy, gdy wynik osiągnie dolne ograniczenie lower_bound.
+    deadline to chwila zegara time.monotonic().
+    Statystyki fazy trafiają do stats (record_phase).
+    """
+    phase_start = time.monotonic()
+    evaluated = accepted = 0
+    
+    def finish(end):
+        record_phase(stats, "swap", phase_start, evaluated, accepted, end)
+        return best_sequence, best_tardy
+    
     best_sequence = sequence[:]
-    best_tardy = calculate_tardy_jobs(best_sequence, p, d, S)
+    C, T = compute_prefix(best_sequence, p, d, S)
+    L = compute_slack(best_sequence, C, d)
+    best_tardy = T[-1] if T else 0
+    
+    evaluator = make_evaluator(backend, p, d, S)
+    if evaluator is not None:
+        state = evaluator.prefix(best_sequence)
+    
+    use_candidates = candidates is not None
+    if use_candidates:
+        position = job_positions(best_sequence)
     
     n = len(sequence)
     
@@ -73,46 +921,110 @@ def local_search_2opt(sequence, p, d, S, time_limit, start_time):
     improved = True
     iterations = 0
     
-    while improved and iterations < max_iterations:
+    while improved and iterations < max_iterations and best_tardy > lower_bound:
         # Sprawdź czas na początku iteracji
-        elapsed = time.time() - start_time
-        if elapsed > time_limit * 0.85:  # Zostaw 15% zapasu
+        if time.monotonic() > deadline:
             break
         
         improved = False
         
         # Próbuj wszystkie możliwe zamiany 2-opt
         for i in range(len(sequence) - 1):
-            # Dla dużych n sprawdzaj czas częściej
-            if n > 400 and i % 50 == 0:
-                elapsed = time.time() - start_time
-                if elapsed > time_limit * 0.85:
-                    return best_sequence, best_tardy
-            
-            for j in range(i + 1, len(sequence)):
-                # Stwórz nową sekwencję z zamianą
-                new_sequence = best_sequence[:]
-                new_sequence[i], new_sequence[j] = new_sequence[j], new_sequence[i]
-                
-                new_tardy = calculate_tardy_jobs(new_sequence, p, d, S)
+            # Pozycja to do n ocen, więc czas sprawdzamy przy każdej
+            if time.monotonic() > deadline:
+                return finish("time_limit")
+            
+            if use_candidates:
+                js = swap_candidates(best_sequence, position, i, candidates)
+            elif evaluator is not None:
+                # Oceń blok zamian (i, j) dla wszystkich j naraz
+                j = i + 1
+                while j < n:
+                    scores = evaluator.swap_scores(state, i, j)
+                    evaluated += len(scores)
+                    hits = np.flatnonzero(scores < best_tardy)
+                    if len(hits) == 0:
+                        break
+                    
+                    # Pierwsza poprawa, dalej oceniaj już nową sekwencję
+                    best_tardy = int(scores[hits[0]])
+                    j += int(hits[0])
+                    best_sequence[i], best_sequence[j] = best_sequence[j], best_sequence[i]
+                    state = evaluator.prefix(best_sequence)
+                    improved = True
+                    accepted += 1
+                    
+                    if best_tardy <= lower_bound:
+                        return finish("lower_bound")
+                    j += 1
+                continue
+            else:
+                js = range(i + 1, len(sequence))
+            
+            evaluated += len(js)
+            for j in js:
+                # Oceń zamianę przyrostowo na podstawie prefiksów
+                new_tardy = evaluate_swap(
+                    best_sequence, C, T, L, i, j, p, d, S, best_tardy
+                )
                 
                 if new_tardy < best_tardy:
-                    best_sequence = new_sequence
+                    best_sequence[i], best_sequence[j] = best_sequence[j], best_sequence[i]
                     best_tardy = new_tardy
+                    C, T = compute_prefix(best_sequence, p, d, S)
+                    L = compute_slack(best_sequence, C, d)
+                    if candidates is not None:
+                        position[best_sequence[i] - 1] = i
+                        position[best_sequence[j] - 1] = j
+                    if evaluator is not None:
+                        state = evaluator.prefix(best_sequence)
                     improved = True
+                    accepted += 1
                     
-                    # Jeśli znalazłeś optimum (0 opóźnień), wyjdź
-                    if best_tardy == 0:
-                        return best_sequence, best_tardy
+                    # Jeśli osiągnięto dolne ograniczenie, wynik jest optymalny
+                    if best_tardy <= lower_bound:
+                        return finish("lower_bound")
+        
+        # Kandydaci wyczerpani: przejdź na pełne sąsiedztwo i z powrotem
+        if candidates is not None:
+            if use_candidates and not improved:
+                improved = True
+                use_candidates = False
+            elif not use_candidates:
+                use_candidates = True
+                C, T = compute_prefix(best_sequence, p, d, S)
+                L = compute_slack(best_sequence, C, d)
+                position = job_positions(best_sequence)
         
         iterations += 1
     
-    return best_sequence, best_tardy
+    return finish(phase_end(improved, iterations, max_iterations, best_tardy, lower_bound))
 
-def insertion_local_search(sequence, p, d, S, time_limit, start_time):
-    """Przeszukiwanie lokalne z przesunięciami (insertion moves)"""
+def insertion_local_search(sequence, p, d, S, deadline, backend="python",
+                           candidates=None, lower_bound=0, stats=None):
+    """
+    Przeszukiwanie lokalne z przesunięciami (insertion moves).
+    Z listami kandydatów ocenia tylko pozycje obok tanich sąsiadów,
+    a pełne sąsiedztwo dopiero gdy te się wyczerpią.
+    deadline to chwila zegara time.monotonic().
+    Statystyki fazy trafiają do stats (record_phase).
+    """
+    phase_start = time.monotonic()
+    evaluated = accepted = 0
+    
+    def finish(end):
+        record_phase(stats, "insert", phase_start, evaluated, accepted, end)
+        return best_sequence, best_tardy
+    
     best_sequence = sequence[:]
     best_tardy = calculate_tardy_jobs(best_sequence, p, d, S)
+    evaluator = make_evaluator(backend, p, d, S)
+    
+    use_candidates = candidates is not None
+    if use_candidates:
+        position = job_positions(best_sequence)
+        C, T = compute_prefix(best_sequence, p, d, S)
+        L = compute_slack(best_sequence, C, d)
     
     n = len(sequence)
     
@@ -124,76 +1036,1417 @@ def insertion_local_search(sequence, p, d, S, time_limit, start_time):
     improved = True
     iterations = 0
     
-    while improved and iterations < max_iterations:
+    while improved and iterations < max_iterations and best_tardy > lower_bound:
         # Sprawdź czas
-        elapsed = time.time() - start_time
-        if elapsed > time_limit * 0.95:  # Użyj do 95% czasu
+        if time.monotonic() > deadline:
             break
         
         improved = False
         
         # Próbuj przesunąć każde zadanie w inne miejsce
         for i in range(len(sequence)):
-            # Dla dużych n sprawdzaj czas częściej
-            if n > 400 and i % 30 == 0:
-                elapsed = time.time() - start_time
-                if elapsed > time_limit * 0.95:
-                    return best_sequence, best_tardy
-            
-            for j in range(len(sequence)):
-                if i == j:
-                    continue
-                
-                # Stwórz nową sekwencję z przesunięciem
-                new_sequence = best_sequence[:]
-                job = new_sequence.pop(i)
-                new_sequence.insert(j, job)
+            # Pozycja to do n ocen, więc czas sprawdzamy przy każdej
+            if time.monotonic() > deadline:
+                return finish("time_limit")
+            
+            if use_candidates:
+                # Oceń tylko pozycje kandydujące, przyrostowo
+                j = -1
+                new_tardy = best_tardy
+                targets = insertion_candidates(best_sequence, position, i, candidates)
+                evaluated += len(targets)
+                for target in targets:
+                    value = evaluate_relocation(
+                        best_sequence, C, T, L, i, target, p, d, S, new_tardy
+                    )
+                    if value < new_tardy:
+                        j, new_tardy = target, value
+            else:
+                # Oceń wszystkie pozycje docelowe naraz, wybierz najlepszą
+                if evaluator is not None:
+                    scores = evaluator.insertion_scores(best_sequence, i)
+                else:
+                    scores = evaluate_insertions(best_sequence, i, p, d, S)
+                evaluated += len(scores) - 1
+                scores[i] = best_tardy
+                j = min(range(len(scores)), key=scores.__getitem__)
+                new_tardy = int(scores[j])
+            
+            if new_tardy < best_tardy:
+                job = best_sequence.pop(i)
+                best_sequence.insert(j, job)
+                best_tardy = new_tardy
+                improved = True
+                accepted += 1
+                if candidates is not None:
+                    position = job_positions(best_sequence)
+                    C, T = compute_prefix(best_sequence, p, d, S)
+                    L = compute_slack(best_sequence, C, d)
                 
-                new_tardy = calculate_tardy_jobs(new_sequence, p, d, S)
+                if best_tardy <= lower_bound:
+                    return finish("lower_bound")
+        
+        # Kandydaci wyczerpani: przejdź na pełne sąsiedztwo i z powrotem
+        if candidates is not None:
+            if use_candidates and not improved:
+                improved = True
+                use_candidates = False
+            else:
+                use_candidates = True
+        
+        iterations += 1
+    
+    return finish(phase_end(improved, iterations, max_iterations, best_tardy, lower_bound))
+
+# Najdłuższy przenoszony segment w sąsiedztwie or-opt
+OR_OPT_MAX_LENGTH = 3
+
+def segment_tardy(sequence, C, L, a, b, reverse, prev, t, p, d, S):
+    """
+    (spóźnione w segmencie, czas zakończenia) dla zadań z pozycji a..b
+    (odwróconych, gdy reverse), jeśli poprzednie zadanie prev kończy się
+    w chwili t. Bez odwrócenia czasy wewnątrz segmentu są już w C,
+    więc segment przesuwa się o stałą i wystarczą luzy L.
+    """
+    if not reverse:
+        first = sequence[a] - 1
+        start = t + (S[prev][first] if prev >= 0 else 0)
+        shift = start + p[first] - C[a]
+        return count_shifted_tardy(L, a, b + 1, shift), C[b] + shift
+    
+    tardy_count = 0
+    for k in range(b, a - 1, -1):
+        job = sequence[k] - 1
+        t += (S[prev][job] if prev >= 0 else 0) + p[job]
+        if t > d[job]:
+            tardy_count += 1
+        prev = job
+    return tardy_count, t
+
+def evaluate_segment_move(sequence, C, T, L, a, b, j, reverse, p, d, S, limit):
+    """
+    Liczba spóźnień po przeniesieniu segmentu a..b (odwróconego, gdy
+    reverse) za zadanie z pozycji j (j = -1: na początek; j < a - 1
+    albo j > b). Poza segmentem liczone jak w evaluate_relocation.
+    Zwraca dokładny wynik, jeśli jest mniejszy niż limit,
+    w przeciwnym razie dowolną wartość >= limit.
+    """
+    n = len(sequence)
+    last = sequence[a if reverse else b] - 1
+    
+    if j > b:
+        # Blok b+1..j przesuwa się w lewo o delta1, segment trafia za sequence[j]
+        c = sequence[b + 1] - 1
+        if a > 0:
+            delta1 = C[a - 1] + S[sequence[a - 1] - 1][c] + p[c] - C[b + 1]
+            tardy_count = T[a - 1]
+        else:
+            delta1 = p[c] - C[b + 1]
+            tardy_count = 0
+        block = (b + 1, j + 1)
+        segment_count, t = segment_tardy(
+            sequence, C, L, a, b, reverse, sequence[j] - 1, C[j] + delta1, p, d, S
+        )
+        suffix = j + 1
+        if suffix < n:
+            c = sequence[suffix] - 1
+            delta2 = t + S[last][c] + p[c] - C[suffix]
+        else:
+            delta2 = 0
+    else:
+        # Segment trafia przed sequence[j + 1], blok j+1..a-1 przesuwa się o delta1
+        if j >= 0:
+            prev, t, tardy_count = sequence[j] - 1, C[j], T[j]
+        else:
+            prev, t, tardy_count = -1, 0, 0
+        segment_count, t = segment_tardy(sequence, C, L, a, b, reverse, prev, t, p, d, S)
+        c = sequence[j + 1] - 1
+        delta1 = t + S[last][c] + p[c] - C[j + 1]
+        block = (j + 1, a)
+        suffix = b + 1
+        if suffix < n:
+            c = sequence[suffix] - 1
+            delta2 = C[a - 1] + delta1 + S[sequence[a - 1] - 1][c] + p[c] - C[suffix]
+        else:
+            delta2 = 0
+    
+    tardy_count += segment_count
+    
+    # Dolne ograniczenie: przesunięcie w prawo nie zmniejsza spóźnień
+    lower_bound = tardy_count
+    if delta1 >= 0:
+        lower_bound += shifted_block_tardy(T, L, block[0], block[1], 0)
+    if delta2 >= 0:
+        lower_bound += T[-1] - T[suffix - 1]
+    if lower_bound >= limit:
+        return lower_bound
+    
+    tardy_count += shifted_block_tardy(T, L, block[0], block[1], delta1)
+    tardy_count += shifted_block_tardy(T, L, suffix, n, delta2)
+    return tardy_count
+
+def or_opt_compress(on_time, p, d, S, deadline, max_length=OR_OPT_MAX_LENGTH):
+    """
+    Or-opt na części terminowej: przenosi segmenty (także odwrócone) tak,
+    by zmniejszyć sumę przezbrojeń, a więc czas zakończenia, bez spóźnień.
+    Zmianę przezbrojeń liczymy w O(1) z przezbrojeń na granicach i
+    prefiksowych sum przezbrojeń wewnątrz segmentu (w przód i wstecz),
+    a terminowość sprawdza evaluate_segment_move tylko dla ruchów
+    skracających. Modyfikuje listę, zwraca True, jeśli ją zmieniło.
+    """
+    m = len(on_time)
+    changed = False
+    pass_changed = True
+    
+    # Każdy ruch zmniejsza sumę przezbrojeń, więc pętla się kończy
+    while pass_changed:
+        pass_changed = False
+        for length in range(1, max_length + 1):
+            a = 0
+            stale = True
+            while a + length <= m:
+                if time.monotonic() > deadline:
+                    return changed
                 
-                if new_tardy < best_tardy:
-                    best_sequence = new_sequence
-                    best_tardy = new_tardy
-                    improved = True
+                if stale:
+                    C, T = compute_prefix(on_time, p, d, S)
+                    L = compute_slack(on_time, C, d)
+                    jobs = [job_id - 1 for job_id in on_time]
                     
-                    if best_tardy == 0:
-                        return best_sequence, best_tardy
+                    # link[k]: przezbrojenie między pozycjami k i k+1,
+                    # F i R: jego sumy prefiksowe w przód i wstecz
+                    link = [S[jobs[k]][jobs[k + 1]] for k in range(m - 1)] + [0]
+                    F = [0] * m
+                    R = [0] * m
+                    for k in range(1, m):
+                        F[k] = F[k - 1] + link[k - 1]
+                        R[k] = R[k - 1] + S[jobs[k]][jobs[k - 1]]
+                    stale = False
+                
+                b = a + length - 1
+                # Wyjęcie segmentu: znikają dwa połączenia, powstaje jedno
+                gain = link[b]
+                if a > 0:
+                    gain += link[a - 1]
+                    if b + 1 < m:
+                        gain -= S[jobs[a - 1]][jobs[b + 1]]
+                
+                best_move = None
+                best_delta = 0
+                for reverse in ((False, True) if length > 1 else (False,)):
+                    first, last = (jobs[b], jobs[a]) if reverse else (jobs[a], jobs[b])
+                    internal = R[b] - R[a] - F[b] + F[a] if reverse else 0
+                    for j in chain(range(-1, a - 1), range(b + 1, m)):
+                        # Wstawienie między pozycje j i j+1
+                        delta = internal - gain
+                        if j >= 0:
+                            delta += S[jobs[j]][first] - link[j]
+                        if j + 1 < m:
+                            delta += S[last][jobs[j + 1]]
+                        if delta < best_delta and evaluate_segment_move(
+                            on_time, C, T, L, a, b, j, reverse, p, d, S, 1
+                        ) == 0:
+                            best_move, best_delta = (j, reverse), delta
+                
+                if best_move is not None:
+                    j, reverse = best_move
+                    segment = on_time[a:b + 1]
+                    if reverse:
+                        segment.reverse()
+                    rest = on_time[:a] + on_time[b + 1:]
+                    at = j + 1 if j < a else j - length + 1
+                    on_time[:] = rest[:at] + segment + rest[at:]
+                    changed = pass_changed = stale = True
+                    continue
+                a += 1
+    
+    return changed
+
+def split_on_time(sequence, p, d, S):
+    """
+    Dzieli sekwencję na uporządkowaną część terminową i zbiór spóźnionych.
+    Spóźnione zadania przenosimy na koniec, więc nie opóźniają pozostałych.
+    """
+    on_time = []
+    tardy = []
+    current_time = 0
+    prev_job = -1
+    
+    for job_id in sequence:
+        job = job_id - 1
+        completion = current_time + p[job]
+        if prev_job >= 0:
+            completion += S[prev_job][job]
         
-        iterations += 1
+        if completion <= d[job]:
+            on_time.append(job_id)
+            current_time = completion
+            prev_job = job
+        else:
+            tardy.append(job_id)
+    
+    return on_time, tardy
+
+def join_partition(on_time, tardy, d):
+    """Pełna permutacja: część terminowa, a za nią spóźnione według terminów"""
+    return on_time + sorted(tardy, key=lambda j: d[j - 1])
+
+def suffix_min_slack(L):
+    """M[k] = minimalny luz na pozycjach k..m-1, M[m] = nieskończoność"""
+    M = [float('inf')] * (len(L) + 1)
+    for k in range(len(L) - 1, -1, -1):
+        M[k] = min(M[k + 1], L[k])
+    return M
+
+def max_link_setup(on_time, S):
+    """Największe przezbrojenie między sąsiednimi zadaniami sekwencji"""
+    return max((S[a - 1][b - 1] for a, b in zip(on_time, on_time[1:])), default=0)
+
+def best_feasible_insertion(on_time, C, M, job_id, p, d, S, max_link):
+    """
+    Pozycja wstawienia zadania do części terminowej, przy której wszystkie
+    zadania pozostają terminowe, a dodany czas jest najmniejszy.
+    Zwraca (pozycja, przesunięcie) albo None.
+    """
+    x = job_id - 1
+    p_x = p[x]
+    d_x = d[x]
+    row_x = S[x]
+    m = len(on_time)
+    best = None
+    
+    # Przesunięcie sufiksu to co najmniej p_x - S[a][b] (z tablicami:
+    # p_x + min_out - S[a][b] + min_in, a przy nierówności trójkąta p_x),
+    # a M jest niemalejące, więc wcześniejsze pozycje nie zmieszczą zadania
+    tables = getattr(S, "tables", None)
+    if tables is not None:
+        min_in_x = tables.min_in[x]
+        least_shift = p_x + tables.min_out[x] + min(0, min_in_x - max_link)
+        if tables.triangle:
+            least_shift = max(least_shift, p_x)
+    else:
+        min_in_x = 0
+        least_shift = p_x - max_link
+    
+    for j in range(bisect_left(M, least_shift, 0, m), m + 1):
+        if j > 0:
+            a = on_time[j - 1] - 1
+            start = C[j - 1]
+            # Czasy C rosną, więc na dalszych pozycjach też będzie za późno
+            if start + min_in_x + p_x > d_x:
+                break
+            t = start + S[a][x] + p_x
+        else:
+            start = 0
+            t = p_x
+        
+        if t > d_x:
+            continue
+        
+        if j < m:
+            # Sufiks przesuwa się o shift i musi pozostać terminowy
+            b = on_time[j] - 1
+            shift = t + row_x[b] - start
+            if j > 0:
+                shift -= S[a][b]
+            if shift > M[j]:
+                continue
+        else:
+            shift = t - start
+        
+        if best is None or shift < best[1]:
+            best = (j, shift)
+    
+    return best
+
+def insert_tardy_jobs(on_time, tardy, p, d, S):
+    """
+    Wstawia zadania ze zbioru spóźnionych do części terminowej, dopóki
+    któreś mieści się bez spóźnień. Modyfikuje obie listy, zwraca liczbę
+    wstawionych zadań.
+    """
+    inserted = 0
+    C, T = compute_prefix(on_time, p, d, S)
+    M = suffix_min_slack(compute_slack(on_time, C, d))
+    max_link = max_link_setup(on_time, S)
+    
+    k = 0
+    while k < len(tardy):
+        job_id = tardy[k]
+        position = best_feasible_insertion(on_time, C, M, job_id, p, d, S, max_link)
+        if position is None:
+            k += 1
+            continue
+        
+        on_time.insert(position[0], job_id)
+        tardy.pop(k)
+        inserted += 1
+        C, T = compute_prefix(on_time, p, d, S)
+        M = suffix_min_slack(compute_slack(on_time, C, d))
+        max_link = max_link_setup(on_time, S)
+    
+    return inserted
+
+def partition_local_search(sequence, p, d, S, deadline, lower_bound=0, stats=None):
+    """
+    Przeszukiwanie w reprezentacji: terminowa sekwencja + zbiór spóźnionych
+    dołączony na końcu. Ruchy: wstawienie spóźnionego zadania do części
+    terminowej, przeniesienie zadania terminowego do zbioru spóźnionych
+    połączone z wstawieniem co najmniej dwóch innych oraz or-opt
+    skracający część terminową (or_opt_compress). deadline to chwila
+    zegara time.monotonic(). Statystyki fazy trafiają do stats (record_phase).
+    """
+    phase_start = time.monotonic()
+    evaluated = accepted = 0
+    end = "local_optimum"
+    
+    on_time, tardy = split_on_time(sequence, p, d, S)
+    # Zadania spóźnione nawet na pierwszej pozycji nie są kandydatami
+    hopeless = [j for j in tardy if p[j - 1] > d[j - 1]]
+    tardy = sorted((j for j in tardy if p[j - 1] <= d[j - 1]), key=lambda j: d[j - 1])
+    triangle = getattr(S, "tables", None) is not None and S.tables.triangle
+    
+    improved = True
+    while improved and tardy and len(tardy) + len(hopeless) > lower_bound:
+        if time.monotonic() > deadline:
+            end = "time_limit"
+            break
+        
+        evaluated += len(tardy)
+        improved = insert_tardy_jobs(on_time, tardy, p, d, S) > 0
+        
+        # Usuń zadanie k i spróbuj wstawić w jego miejsce dwa inne
+        for k in range(len(on_time)):
+            if time.monotonic() > deadline:
+                end = "time_limit"
+                break
+            
+            evaluated += 1
+            trial = on_time[:k] + on_time[k + 1:]
+            # Przy nierówności trójkąta usunięcie nigdy nie opóźnia reszty
+            if not triangle:
+                C, T = compute_prefix(trial, p, d, S)
+                if T and T[-1] > 0:
+                    continue  # Usunięcie wydłużyło przezbrojenie i coś się spóźnia
+            
+            pool = tardy + [on_time[k]]
+            if insert_tardy_jobs(trial, pool, p, d, S) >= 2:
+                on_time = trial
+                tardy = sorted(pool, key=lambda j: d[j - 1])
+                improved = True
+                break
+        
+        # Skróć część terminową przenosząc segmenty, by zrobić miejsce
+        if not improved:
+            evaluated += 1
+            improved = or_opt_compress(on_time, p, d, S, deadline)
+        accepted += improved
+    
+    if len(tardy) + len(hopeless) <= lower_bound:
+        end = "lower_bound"
+    record_phase(stats, "partition", phase_start, evaluated, accepted, end)
+    
+    full_sequence = join_partition(on_time, tardy + hopeless, d)
+    return full_sequence, calculate_tardy_jobs(full_sequence, p, d, S)
+
+def min_incoming_setups(S):
+    """Najtańsze przezbrojenie wejściowe każdego zadania (minimum kolumny bez przekątnej)"""
+    if getattr(S, "tables", None) is not None:
+        return S.tables.min_in
+    n = len(S)
+    if n <= 1:
+        return [0] * n
+    if np is not None:
+        matrix = np.array(S, dtype=np.int64)
+        np.fill_diagonal(matrix, matrix.max())
+        return matrix.min(axis=0).tolist()
+    return [min(S[i][j] for i in range(n) if i != j) for j in range(n)]
+
+def moore_hodgson_count(jobs, lengths, d, start=0, slack=0):
+    """
+    Maksymalna liczba zadań terminowych dla 1||ΣUj (algorytm Moore'a-Hodgsona)
+    jobs: zadania (od 0) w kolejności EDD, lengths: czasy wykonania,
+    start: chwila rozpoczęcia, slack: luz dodawany do każdego terminu
+    """
+    heap = []
+    finish = start
+    for j in jobs:
+        heappush(heap, -lengths[j])
+        finish += lengths[j]
+        if finish > d[j] + slack:
+            finish += heappop(heap)
+    return len(heap)
+
+def tardy_lower_bound(n, p, d, S, min_in=None):
+    """
+    Dolne ograniczenie liczby spóźnionych zadań. Relaksacja: każde zadanie
+    trwa p + najtańsze przezbrojenie wejściowe, a pierwsze zadanie nie ma
+    przezbrojenia, więc terminy przesuwamy o największe z tych minimów.
+    Z tablicami S.tables liczymy też relaksację z przezbrojeniami
+    wyjściowymi (termin zadania przesunięty o jego własne minimum, bo
+    jego przezbrojenie wyjściowe jest już po nim) i bierzemy lepszą.
+    Wynik to co najmniej liczba zadań z p > d.
+    """
+    if n == 0:
+        return 0
+    if min_in is None:
+        min_in = min_incoming_setups(S)
+    lengths = [p[j] + min_in[j] for j in range(n)]
+    edd_jobs = sorted(range(n), key=lambda j: d[j])
+    on_time = moore_hodgson_count(edd_jobs, lengths, d, slack=max(min_in))
+    
+    tables = getattr(S, "tables", None)
+    if tables is not None:
+        min_out = tables.min_out
+        lengths = [p[j] + min_out[j] for j in range(n)]
+        shifted = [d[j] + min_out[j] for j in range(n)]
+        edd_jobs = sorted(range(n), key=shifted.__getitem__)
+        on_time = min(on_time, moore_hodgson_count(edd_jobs, lengths, shifted))
+    
+    hopeless = sum(1 for j in range(n) if p[j] > d[j])
+    return max(n - on_time, hopeless)
+
+# Rozwiązanie dokładne dla małych instancji i okna re-optymalizacji.
+# Do n=28 programowanie dynamiczne dowodzi optymalności w 0-2 s, ale przy
+# n=30 potrzebuje od 2 do ok. 50 s, więc tryb dokładny kończy się na n=25
+EXACT_MAX_N = 25
+EXACT_HEURISTIC_FRACTION = 0.2
+WINDOW_WIDTH = 7
+
+def exact_solve(n, p, d, S, deadline=None, initial=None, lower_bound=0):
+    """
+    Programowanie dynamiczne po stanach (zbiór zadań terminowych, ostatnie
+    zadanie) z minimalnym czasem zakończenia; klucz stanu to liczba
+    maska * n + ostatnie. Warstwa k zawiera sekwencje k zadań terminowych,
+    spóźnione dokłada się na końcu. Stan odcinamy, gdy ograniczenie
+    górne (Moore-Hodgson dla pozostałych zadań z najtańszymi
+    przezbrojeniami) nie pozwala pobić najlepszego znanego wyniku.
+    Zwraca (sekwencja, spóźnione, certified); certified=False, jeśli minął
+    termin deadline i wynik jest tylko najlepszym znalezionym.
+    """
+    if initial is None:
+        initial = setup_moore_hodgson(n, p, d, S)
+    best_sequence = initial
+    best_on_time = n - calculate_tardy_jobs(initial, p, d, S)
+    if n - best_on_time <= lower_bound:
+        return best_sequence, n - best_on_time, True
+    
+    jobs = [j for j in range(n) if p[j] <= d[j]]
+    min_in = min_incoming_setups(S)
+    relaxed_p = [p[j] + min_in[j] for j in range(n)]
+    edd_jobs = sorted(jobs, key=lambda j: d[j])
+    
+    # Wpis stanu: (czas zakończenia, ostatnie zadanie, wpis poprzedni)
+    layer = {}
+    for j in jobs:
+        layer[(1 << j) * n + j] = (p[j], j, None)
+    
+    level = 1
+    best_entry = None
+    certified = True
+    
+    while layer:
+        if level > best_on_time:
+            best_on_time = level
+            best_entry = next(iter(layer.values()))
+        
+        next_layer = {}
+        for count, (key, entry) in enumerate(layer.items()):
+            if deadline is not None and count & 1023 == 0 and time.monotonic() > deadline:
+                certified = False
+                break
+            
+            mask, last = divmod(key, n)
+            t = entry[0]
+            
+            # Górne ograniczenie: Moore-Hodgson dla pozostałych zadań
+            # z czasami p + najtańsze przezbrojenie wejściowe
+            remaining = (j for j in edd_jobs if not mask >> j & 1)
+            if level + moore_hodgson_count(remaining, relaxed_p, d, t) <= best_on_time:
+                continue
+            
+            row = S[last]
+            for j in jobs:
+                if mask >> j & 1:
+                    continue
+                c = t + row[j] + p[j]
+                if c > d[j]:
+                    continue
+                next_key = (mask | 1 << j) * n + j
+                old = next_layer.get(next_key)
+                if old is None or c < old[0]:
+                    next_layer[next_key] = (c, j, entry)
+        
+        if not certified:
+            break
+        layer = next_layer
+        level += 1
+    
+    if best_entry is not None:
+        on_time = []
+        while best_entry is not None:
+            on_time.append(best_entry[1] + 1)
+            best_entry = best_entry[2]
+        on_time.reverse()
+        scheduled = set(on_time)
+        tardy = [j for j in range(1, n + 1) if j not in scheduled]
+        best_sequence = join_partition(on_time, tardy, d)
+    
+    return best_sequence, calculate_tardy_jobs(best_sequence, p, d, S), certified
+
+def pareto_add(front, tardy_count, finish, entry):
+    """Dodaje wpis do frontu Pareto (spóźnione, czas); False, jeśli zdominowany"""
+    for other in front:
+        if other[0] <= tardy_count and other[1] <= finish:
+            return False
+    front[:] = [other for other in front if other[0] < tardy_count or other[1] < finish]
+    front.append(entry)
+    return True
+
+def reoptimize_window(sequence, C, T, L, start, width, p, d, S):
+    """
+    Optymalna kolejność zadań na pozycjach start..start+width-1 przy
+    reszcie sekwencji bez zmian. DP po (zbiór, ostatnie) trzyma front
+    Pareto (spóźnione w oknie, czas zakończenia), bo wcześniejsze
+    zakończenie może uratować zadania za oknem. Sufiks oceniamy z luzów L
+    jak w evaluate_swap. Zwraca (nowe okno, spóźnione łącznie).
+    """
+    n = len(sequence)
+    end = min(start + width, n)
+    window = [job_id - 1 for job_id in sequence[start:end]]
+    w = len(window)
+    
+    if start > 0:
+        t0, prev, base = C[start - 1], sequence[start - 1] - 1, T[start - 1]
+    else:
+        t0, prev, base = 0, -1, 0
+    
+    # Wpis: (spóźnione w oknie, czas zakończenia, indeks w oknie, poprzedni)
+    layer = {}
+    for k, job in enumerate(window):
+        c = t0 + (S[prev][job] if prev >= 0 else 0) + p[job]
+        layer[(1 << k) * w + k] = [(int(c > d[job]), c, k, None)]
+    
+    for _ in range(w - 1):
+        next_layer = {}
+        for key, front in layer.items():
+            mask, last = divmod(key, w)
+            row = S[window[last]]
+            for k in range(w):
+                if mask >> k & 1:
+                    continue
+                job = window[k]
+                next_front = next_layer.setdefault((mask | 1 << k) * w + k, [])
+                for entry in front:
+                    c = entry[1] + row[job] + p[job]
+                    tardy_count = entry[0] + (c > d[job])
+                    pareto_add(next_front, tardy_count, c, (tardy_count, c, k, entry))
+        layer = next_layer
+    
+    best_total, best_entry = None, None
+    for key, front in layer.items():
+        last = window[key % w]
+        for entry in front:
+            total = base + entry[0]
+            if end < n:
+                c = sequence[end] - 1
+                delta = entry[1] + S[last][c] + p[c] - C[end]
+                total += shifted_block_tardy(T, L, end, n, delta)
+            if best_total is None or total < best_total:
+                best_total, best_entry = total, entry
+    
+    order = []
+    while best_entry is not None:
+        order.append(window[best_entry[2]] + 1)
+        best_entry = best_entry[3]
+    order.reverse()
+    return order, best_total
+
+def window_local_search(sequence, p, d, S, deadline, width=WINDOW_WIDTH, lower_bound=0):
+    """
+    Przesuwa okno o szerokości width z krokiem width // 2 i zastępuje
+    jego zawartość optymalną kolejnością z reoptimize_window, dopóki
+    pełny przebieg coś poprawia lub do terminu deadline.
+    """
+    current = sequence[:]
+    C, T = compute_prefix(current, p, d, S)
+    current_tardy = T[-1] if T else 0
+    step = max(1, width // 2)
+    
+    improved = True
+    while improved and current_tardy > lower_bound:
+        improved = False
+        L = compute_slack(current, C, d)
+        for start in range(0, max(1, len(current) - width + 1), step):
+            if time.monotonic() > deadline:
+                return current, current_tardy
+            
+            order, tardy_count = reoptimize_window(current, C, T, L, start, width, p, d, S)
+            if tardy_count < current_tardy:
+                current[start:start + len(order)] = order
+                C, T = compute_prefix(current, p, d, S)
+                L = compute_slack(current, C, d)
+                current_tardy = tardy_count
+                improved = True
+                if current_tardy <= lower_bound:
+                    break
+    
+    return current, current_tardy
+
+# Parametry iterowanego przeszukiwania lokalnego (ILS)
+ILS_TIME_FRACTION = 0.9
+ILS_STRENGTH = 3
+ILS_EJECT_PROBABILITY = 0.8
+ILS_WORSE_ACCEPTANCE = 0.02
+ILS_RESTART_AFTER = 50
+
+def perturb_sequence(sequence, rng, strength):
+    """
+    Losowy kopniak w oknie długości 4 * strength: double-bridge
+    (zamiana dwóch sąsiednich segmentów) albo przetasowanie segmentu
+    """
+    n = len(sequence)
+    width = min(n, 4 * strength)
+    lo = rng.randrange(n - width + 1)
+    window = sequence[lo:lo + width]
+    
+    if width >= 4 and rng.random() < 0.5:
+        a, b, c = sorted(rng.sample(range(1, width), 3))
+        window = window[:a] + window[b:c] + window[a:b] + window[c:]
+    else:
+        length = min(width, strength)
+        start = rng.randrange(width - length + 1)
+        segment = window[start:start + length]
+        rng.shuffle(segment)
+        window[start:start + length] = segment
+    
+    return sequence[:lo] + window + sequence[lo + width:]
+
+def eject_jobs(on_time, tardy, rng, strength):
+    """Losowy kopniak: przenosi do 'strength' pobliskich zadań terminowych do spóźnionych"""
+    lo = rng.randrange(len(on_time))
+    positions = {min(len(on_time) - 1, lo + rng.randrange(2 * strength))
+                 for _ in range(rng.randint(1, strength))}
+    for k in sorted(positions, reverse=True):
+        tardy.append(on_time.pop(k))
+
+def iterated_local_search(sequence, p, d, S, deadline, rng=None, lower_bound=0, stats=None):
+    """
+    Iterowane przeszukiwanie lokalne w reprezentacji terminowa sekwencja
+    + zbiór spóźnionych: kopnięcie (double-bridge, przetasowanie segmentu
+    albo wyrzucenie kilku zadań), zejście przez wstawianie spóźnionych
+    zadań, akceptacja nie gorszych. Działa do terminu deadline
+    (time.monotonic) albo do osiągnięcia dolnego ograniczenia lower_bound
+    i zwraca najlepsze znalezione rozwiązanie. Statystyki (liczba kopnięć
+    i przyjętych prób) trafiają do stats.
+    """
+    if rng is None:
+        rng = random.Random(0)
+    phase_start = time.monotonic()
+    evaluated = accepted = 0
+    
+    on_time, tardy = split_on_time(sequence, p, d, S)
+    hopeless = [j for j in tardy if p[j - 1] > d[j - 1]]
+    tardy = sorted((j for j in tardy if p[j - 1] <= d[j - 1]), key=lambda j: d[j - 1])
+    insert_tardy_jobs(on_time, tardy, p, d, S)
+    
+    best_on_time, best_tardy = on_time[:], tardy[:]
+    since_best = 0
+    
+    while (best_tardy and len(best_tardy) + len(hopeless) > lower_bound
+           and len(on_time) >= 4 and time.monotonic() < deadline):
+        evaluated += 1
+        trial_on_time = on_time[:]
+        trial_tardy = tardy[:]
+        
+        if rng.random() < ILS_EJECT_PROBABILITY:
+            eject_jobs(trial_on_time, trial_tardy, rng, ILS_STRENGTH)
+        else:
+            # Zmiana kolejności może spóźnić część zadań terminowych
+            reordered = perturb_sequence(trial_on_time, rng, ILS_STRENGTH)
+            trial_on_time, late = split_on_time(reordered, p, d, S)
+            trial_tardy.extend(late)
+        
+        trial_tardy.sort(key=lambda j: d[j - 1])
+        insert_tardy_jobs(trial_on_time, trial_tardy, p, d, S)
+        
+        # Akceptuj nie gorsze, a gorsze z małym prawdopodobieństwem
+        if len(trial_tardy) <= len(tardy) or rng.random() < ILS_WORSE_ACCEPTANCE:
+            on_time, tardy = trial_on_time, trial_tardy
+            accepted += 1
+        
+        if len(tardy) < len(best_tardy):
+            best_on_time, best_tardy = on_time[:], tardy[:]
+            record_best(stats, len(best_tardy) + len(hopeless))
+            since_best = 0
+        else:
+            since_best += 1
+            # Długo bez poprawy: wróć do najlepszego rozwiązania
+            if since_best >= ILS_RESTART_AFTER:
+                on_time, tardy = best_on_time[:], best_tardy[:]
+                since_best = 0
+    
+    if len(best_tardy) + len(hopeless) <= lower_bound:
+        end = "lower_bound"
+    elif best_tardy and len(on_time) >= 4:
+        end = "time_limit"
+    else:
+        end = "local_optimum"
+    record_phase(stats, "ils", phase_start, evaluated, accepted, end)
+    
+    best_sequence = join_partition(best_on_time, best_tardy + hopeless, d)
+    return best_sequence, calculate_tardy_jobs(best_sequence, p, d, S)
+
+# Parametry przeszukiwania tabu
+TABU_TENURE_MIN = 5
+TABU_TENURE_DIV = 20
+TABU_SAMPLE = 40
+
+def tabu_search(sequence, p, d, S, deadline, rng=None, candidates=None, lower_bound=0,
+                stats=None):
+    """
+    Przeszukiwanie tabu na sąsiedztwach zamian i przesunięć. Atrybutem
+    tabu jest para (zadanie, pozycja), z której zadanie zostało zabrane,
+    trzymana w słowniku z kluczem zadanie * n + pozycja (sprawdzenie O(1)).
+    Kadencja rośnie z n, ruch tabu jest dozwolony, gdy poprawia najlepszy
+    wynik (aspiracja). W każdej iteracji oceniamy ruchy z list kandydatów
+    dla losowej próbki pozycji i wykonujemy najlepszy dopuszczalny ruch,
+    także pogarszający. Działa do terminu deadline (time.monotonic)
+    albo do osiągnięcia dolnego ograniczenia lower_bound.
+    """
+    if rng is None:
+        rng = random.Random(0)
+    if candidates is None:
+        candidates = build_candidate_lists(S, CANDIDATE_K)
+    phase_start = time.monotonic()
+    evaluated = accepted = 0
     
+    n = len(sequence)
+    current = sequence[:]
+    C, T = compute_prefix(current, p, d, S)
+    L = compute_slack(current, C, d)
+    position = job_positions(current)
+    best_sequence, best_tardy = current[:], (T[-1] if T else 0)
+    
+    tabu = {}
+    iteration = 0
+    
+    while best_tardy > lower_bound and n >= 3 and time.monotonic() < deadline:
+        iteration += 1
+        tenure = TABU_TENURE_MIN + n // TABU_TENURE_DIV + rng.randint(0, 2)
+        move = None
+        move_tardy = n + 1
+        
+        for i in rng.sample(range(n - 1), min(TABU_SAMPLE, n - 1)):
+            x = current[i] - 1
+            
+            # Zamiany: x trafia na j, y na i
+            for j in swap_candidates(current, position, i, candidates):
+                y = current[j] - 1
+                is_tabu = (tabu.get(x * n + j, 0) >= iteration
+                           or tabu.get(y * n + i, 0) >= iteration)
+                limit = min(move_tardy, best_tardy) if is_tabu else move_tardy
+                evaluated += 1
+                value = evaluate_swap(current, C, T, L, i, j, p, d, S, limit)
+                if value < limit:
+                    move, move_tardy = ('swap', i, j), value
+            
+            # Przesunięcia: x trafia na j
+            for j in insertion_candidates(current, position, i, candidates):
+                is_tabu = tabu.get(x * n + j, 0) >= iteration
+                limit = min(move_tardy, best_tardy) if is_tabu else move_tardy
+                evaluated += 1
+                value = evaluate_relocation(current, C, T, L, i, j, p, d, S, limit)
+                if value < limit:
+                    move, move_tardy = ('insert', i, j), value
+        
+        if move is None:
+            continue
+        
+        # Wykonaj ruch i zabroń powrotu zadań na opuszczone pozycje
+        kind, i, j = move
+        if kind == 'swap':
+            tabu[(current[i] - 1) * n + i] = iteration + tenure
+            tabu[(current[j] - 1) * n + j] = iteration + tenure
+            current[i], current[j] = current[j], current[i]
+        else:
+            tabu[(current[i] - 1) * n + i] = iteration + tenure
+            current.insert(j, current.pop(i))
+        
+        C, T = compute_prefix(current, p, d, S)
+        L = compute_slack(current, C, d)
+        position = job_positions(current)
+        
+        if move_tardy < best_tardy:
+            best_sequence, best_tardy = current[:], move_tardy
+            record_best(stats, best_tardy)
+        accepted += 1
+    
+    end = "lower_bound" if best_tardy <= lower_bound else (
+        "time_limit" if n >= 3 else "local_optimum")
+    record_phase(stats, "tabu", phase_start, evaluated, accepted, end)
     return best_sequence, best_tardy
 
-def solve_instance(n, p, d, S, time_limit):
-    """Główna funkcja rozwiązania"""
-    start_time = time.time()
+# Parametry algorytmu memetycznego
+GA_POPULATION = 24
+GA_MUTATION = 0.3
+GA_RESTART_AFTER = 30
+# batch_decode wyprzedza greedy_decode dopiero od tylu permutacji naraz
+# i takiego n (pomiar: 96 permutacji przy n=2000 to 39 ms wobec 46 ms,
+# przy 24 permutacjach wektorowe kroki są wolniejsze dla każdego n)
+GA_BATCH_MIN = 96
+GA_BATCH_MIN_N = 1000
+
+def greedy_decode(permutation, p, d, S):
+    """
+    Dekoder permutacji (zadania od 1): zadanie trafia do części terminowej,
+    jeśli dołączone na końcu zdąży, inaczej do spóźnionych. Zwraca (terminowe, spóźnione).
+    """
+    on_time = []
+    tardy = []
+    t = 0
+    last = -1
+    for job_id in permutation:
+        job = job_id - 1
+        c = t + (S[last][job] if last >= 0 else 0) + p[job]
+        if c <= d[job]:
+            on_time.append(job_id)
+            t = c
+            last = job
+        else:
+            tardy.append(job_id)
+    return on_time, tardy
+
+def padded_setups(S):
+    """Macierz przezbrojeń int64 z dodatkowym wierszem zer (brak poprzedniego zadania)"""
+    n = len(S)
+    setups = np.zeros((n + 1, n), dtype=np.int64)
+    setups[:n] = np.asarray(S)
+    return setups
+
+def batch_decode(permutations, p, d, setups):
+    """
+    greedy_decode dla całej populacji naraz w NumPy: krok k przetwarza
+    k-te zadanie wszystkich permutacji wektorowo. permutations to tablica
+    (liczba, n) zadań od 1, setups to wynik padded_setups (budowany raz
+    na przeszukiwanie); zwraca maskę (liczba, n) pozycji terminowych.
+    """
+    perms = np.asarray(permutations, dtype=np.int64) - 1
+    count, n = perms.shape
+    p_array = np.asarray(p, dtype=np.int64)
+    d_array = np.asarray(d, dtype=np.int64)
+    
+    t = np.zeros(count, dtype=np.int64)
+    last = np.full(count, n, dtype=np.int64)
+    keep = np.zeros((count, n), dtype=bool)
+    for k in range(n):
+        job = perms[:, k]
+        c = t + setups[last, job] + p_array[job]
+        ok = c <= d_array[job]
+        t = np.where(ok, c, t)
+        last = np.where(ok, job, last)
+        keep[:, k] = ok
+    return keep
+
+def order_crossover(parent1, parent2, rng):
+    """Krzyżowanie OX: segment z pierwszego rodzica, reszta w kolejności z drugiego"""
+    n = len(parent1)
+    a, b = sorted(rng.sample(range(n + 1), 2))
+    segment = parent1[a:b]
+    taken = set(segment)
+    rest = [job_id for job_id in parent2 if job_id not in taken]
+    return rest[:a] + segment + rest[a:]
+
+def refine_split(on_time, tardy, p, d, S):
+    """Krótkie zejście potomka: wstawianie spóźnionych; zwraca (spóźnione, permutacja)"""
+    tardy = sorted(tardy, key=lambda j: d[j - 1])
+    insert_tardy_jobs(on_time, tardy, p, d, S)
+    return len(tardy), on_time + tardy
+
+def _refine_task(permutation):
+    """Dekodowanie i zejście potomka w procesie puli (instancja z _worker_instance)"""
+    n, p, d, S = _worker_instance
+    on_time, tardy = greedy_decode(permutation, p, d, S)
+    return refine_split(on_time, tardy, p, d, S)
+
+def memetic_search(n, p, d, S, deadline, rng=None, initial=(), lower_bound=0, workers=1,
+                   stats=None):
+    """
+    Algorytm memetyczny na permutacjach: selekcja turniejowa, krzyżowanie
+    OX, mutacja przez przesunięcie, dekodowanie zachłanne (batch_decode
+    dla dużych pokoleń, jeśli jest NumPy - zob. GA_BATCH_MIN) i zejście wstawiające spóźnione
+    zadania, którego wynik zastępuje potomka. Różnorodność: w populacji
+    nie ma dwóch osobników z tą samą częścią terminową, a po
+    GA_RESTART_AFTER pokoleniach bez poprawy połowa populacji jest
+    losowana od nowa. Przy workers > 1 potomkowie są oceniani w puli
+    procesów. Zwraca (sekwencja, spóźnione).
+    """
+    if rng is None:
+        rng = random.Random(0)
+    phase_start = time.monotonic()
+    evaluated = accepted = 0
+    
+    executor = None
+    if workers > 1 and isinstance(S, SetupMatrix):
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_portfolio_worker,
+            initargs=(n, p, d, S.data, S.tables)
+        )
+    
+    use_batch = np is not None and n >= GA_BATCH_MIN_N
+    setups = None
+    
+    def evaluate(permutations):
+        nonlocal setups
+        if executor is not None:
+            return list(executor.map(_refine_task, permutations,
+                                     chunksize=max(1, len(permutations) // workers)))
+        if use_batch and len(permutations) >= GA_BATCH_MIN:
+            if setups is None:
+                setups = padded_setups(S)
+            keep = batch_decode(permutations, p, d, setups)
+            splits = [
+                ([job_id for job_id, ok in zip(permutation, row) if ok],
+                 [job_id for job_id, ok in zip(permutation, row) if not ok])
+                for permutation, row in zip(permutations, keep.tolist())
+            ]
+        else:
+            splits = [greedy_decode(permutation, p, d, S) for permutation in permutations]
+        return [refine_split(on_time, tardy, p, d, S) for on_time, tardy in splits]
+    
+    def random_individual():
+        permutation = randomized_edd(n, p, d, rng)
+        for _ in range(rng.randint(0, 3)):
+            i, j = rng.randrange(n), rng.randrange(n)
+            permutation.insert(j, permutation.pop(i))
+        return permutation
+    
+    def add(population, keys, individual):
+        tardy_count, permutation = individual
+        key = tuple(permutation[:n - tardy_count])
+        if key in keys:
+            return False
+        keys.add(key)
+        population.append(individual)
+        return True
+    
+    try:
+        starts = [list(solution) for solution in initial]
+        starts += [random_individual() for _ in range(GA_POPULATION - len(starts))]
+        population, keys = [], set()
+        for individual in evaluate(starts):
+            add(population, keys, individual)
+        
+        best = min(population)
+        since_best = 0
+        
+        while best[0] > lower_bound and n >= 2 and time.monotonic() < deadline:
+            # Pokolenie potomków z turniejów binarnych
+            children = []
+            for _ in range(GA_POPULATION):
+                parent1 = min(rng.sample(population, 2))[1]
+                parent2 = min(rng.sample(population, 2))[1]
+                child = order_crossover(parent1, parent2, rng)
+                if rng.random() < GA_MUTATION:
+                    i, j = rng.randrange(n), rng.randrange(n)
+                    child.insert(j, child.pop(i))
+                children.append(child)
+            
+            # Zastępowanie najgorszych, bez duplikatów
+            evaluated += len(children)
+            for individual in evaluate(children):
+                worst = max(population)
+                if individual <= worst and add(population, keys, individual):
+                    accepted += 1
+                    population.remove(worst)
+                    keys.discard(tuple(worst[1][:n - worst[0]]))
+            
+            generation_best = min(population)
+            if generation_best[0] < best[0]:
+                best = generation_best
+                record_best(stats, best[0])
+                since_best = 0
+            else:
+                since_best += 1
+            
+            # Stagnacja: zostaw lepszą połowę, resztę wylosuj od nowa
+            if since_best >= GA_RESTART_AFTER:
+                population.sort()
+                population = population[:len(population) // 2]
+                keys = {tuple(permutation[:n - tardy_count]) for tardy_count, permutation in population}
+                fresh = [random_individual() for _ in range(GA_POPULATION - len(population))]
+                for individual in evaluate(fresh):
+                    add(population, keys, individual)
+                since_best = 0
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    end = "lower_bound" if best[0] <= lower_bound else "time_limit"
+    record_phase(stats, "memetic", phase_start, evaluated, accepted, end)
+    return best[1], calculate_tardy_jobs(best[1], p, d, S)
+
+# Parametry adaptacyjnego wyboru sąsiedztw
+VND_BURST_FRACTION = 0.1
+VND_DECAY = 0.5
+VND_EXPLORATION = 0.1
+
+def improve_solution(solution, p, d, S, time_limit, deadline, backend="python",
+                     candidates=None, rng=None, method="ils", order="swap", lower_bound=0,
+                     stats=None):
+    """
+    Adaptacyjne przeszukiwanie (VND z wyborem operatora jak w wielorękim
+    bandycie) do terminu deadline albo do dolnego ograniczenia lower_bound.
+    Operatory to zejścia (zamiany, przesunięcia, podział na terminowe i
+    spóźnione) oraz krótkie serie ILS albo tabu (method). Dla każdego
+    operatora pamiętamy wygładzoną poprawę na sekundę CPU i wybieramy
+    najlepszy; zejście jest dostępne tylko, gdy rozwiązanie zmieniło się
+    od jego ostatniego uruchomienia. Nieużyte operatory idą najpierw,
+    w kolejności order ("swap": zamiany przed przesunięciami, "insert": odwrotnie).
+    deadline to chwila zegara time.monotonic(); time_limit wyznacza tylko
+    długość serii (VND_BURST_FRACTION).
+    """
+    if rng is None:
+        rng = random.Random(0)
+    
+    best_solution = solution
+    best_tardy = calculate_tardy_jobs(solution, p, d, S)
+    burst = max(0.1, time_limit * VND_BURST_FRACTION)
+    
+    def swap(current, until):
+        return local_search_2opt(current, p, d, S, until, backend, candidates,
+                                 lower_bound=lower_bound, stats=stats)
+    
+    def insert(current, until):
+        return insertion_local_search(current, p, d, S, until, backend, candidates,
+                                      lower_bound=lower_bound, stats=stats)
+    
+    def partition(current, until):
+        return partition_local_search(current, p, d, S, until, lower_bound=lower_bound,
+                                      stats=stats)
+    
+    burst_end = deadline
+    
+    def perturb(current, until):
+        nonlocal burst_end
+        burst_end = min(until, time.monotonic() + burst)
+        if method == "tabu":
+            return tabu_search(current, p, d, S, burst_end, rng, candidates, lower_bound, stats)
+        return iterated_local_search(current, p, d, S, burst_end, rng, lower_bound, stats)
+    
+    operators = [swap, insert, partition, perturb]
+    if order == "insert":
+        operators[:2] = operators[1::-1]
+    descents = operators[:3]
+    
+    rate = {operator: None for operator in operators}
+    fresh = set(descents)  # zejścia do uruchomienia na bieżącym rozwiązaniu
+    
+    while best_tardy > lower_bound and deadline - time.monotonic() > 0.1:
+        eligible = [operator for operator in operators if operator in fresh or operator is perturb]
+        untried = [operator for operator in eligible if rate[operator] is None]
+        if untried:
+            operator = untried[0]
+        elif rng.random() < VND_EXPLORATION:
+            operator = rng.choice(eligible)
+        else:
+            operator = max(eligible, key=rate.__getitem__)
+        
+        cpu_start = time.process_time()
+        solution_op, tardy_op = operator(best_solution, deadline)
+        cpu = max(time.process_time() - cpu_start, 1e-3)
+        
+        gain = max(0, best_tardy - tardy_op)
+        previous = rate[operator]
+        rate[operator] = gain / cpu if previous is None else (
+            VND_DECAY * previous + (1 - VND_DECAY) * gain / cpu
+        )
+        
+        fresh.discard(operator)
+        if tardy_op < best_tardy:
+            best_solution, best_tardy = solution_op, tardy_op
+            record_best(stats, best_tardy)
+            fresh = set(descents) - {operator}
+        elif operator is perturb and not fresh and time.monotonic() < burst_end:
+            # Seria wróciła przed swoim terminem bez poprawy, czyli ILS/tabu
+            # nie mogły ruszyć (np. mniej niż 4 terminowe zadania), a zejścia
+            # są wyczerpane - dalsze pętle byłyby jałowym biegiem
+            break
+    
+    return best_solution, best_tardy
+
+def solve_instance(n, p, d, S, time_limit, backend="python", candidate_k=None, seed=0,
+                   method="ils", lower_bound=None, beam_width=None, workers=1, stats=None):
+    """
+    Główna funkcja rozwiązania. method wybiera metodę na resztę limitu
+    czasu: "ils" (iterowane przeszukiwanie lokalne), "tabu" albo
+    "memetic" (algorytm memetyczny, potomkowie oceniani w workers procesach).
+    Przeszukiwanie kończy się wcześniej, gdy wynik osiągnie dolne
+    ograniczenie (domyślnie liczone przez tardy_lower_bound). beam_width
+    to szerokość wiązki konstrukcji (domyślnie dobrana do limitu czasu).
+    Jeśli podano słownik stats, zbierane są w nim statystyki przeszukiwania
+    (zob. record_phase i summarize_stats).
+    """
+    start_time = time.monotonic()
+    deadline = start_time + time_limit * ILS_TIME_FRACTION
+    
+    # Listy kandydatów przycinają sąsiedztwa dla dużych instancji
+    if candidate_k is None and n >= CANDIDATE_MIN_N:
+        candidate_k = CANDIDATE_K
+    candidates = build_candidate_lists(S, candidate_k) if candidate_k else None
     
-    # Rozwiązanie początkowe: heurystyka EDD
+    # Rozwiązanie początkowe: najlepsze z EDD, Moore-Hodgsona
+    # z przezbrojeniami i konstrukcji wiązkowej
     initial_solution = edd_heuristic(n, p, d)
     initial_tardy = calculate_tardy_jobs(initial_solution, p, d, S)
     
+    if beam_width is None:
+        beam_width = beam_width_for(n, time_limit)
+    beam_deadline = start_time + time_limit * 2 * BEAM_TIME_FRACTION
+    phase_start = time.monotonic()
+    constructions = [setup_moore_hodgson(n, p, d, S),
+                     beam_search(n, p, d, S, beam_width, deadline=beam_deadline)]
+    if stats is not None:
+        stats["constructions"] = {"edd": initial_tardy}
+    for name, constructed in zip(("mh", "beam"), constructions):
+        constructed_tardy = calculate_tardy_jobs(constructed, p, d, S)
+        if stats is not None:
+            stats["constructions"][name] = constructed_tardy
+        if constructed_tardy < initial_tardy:
+            initial_solution, initial_tardy = constructed, constructed_tardy
+    
     # Jeśli już optymalnie, zwróć
-    if initial_tardy == 0:
+    if lower_bound is None:
+        lower_bound = tardy_lower_bound(n, p, d, S)
+    record_phase(stats, "construction", phase_start, len(constructions) + 1, 1,
+                 "lower_bound" if initial_tardy <= lower_bound else "complete")
+    record_best(stats, initial_tardy)
+    if initial_tardy <= lower_bound:
         return initial_solution, initial_tardy
     
-    # Przeszukiwanie lokalne 2-opt
-    solution_2opt, tardy_2opt = local_search_2opt(
-        initial_solution, p, d, S, time_limit, start_time
+    if method == "memetic":
+        return memetic_search(n, p, d, S, deadline, random.Random(seed), constructions,
+                              lower_bound, workers, stats)
+    
+    return improve_solution(
+        initial_solution, p, d, S, time_limit, deadline, backend,
+        candidates, random.Random(seed), method, lower_bound=lower_bound, stats=stats
     )
+
+def solve_exact(n, p, d, S, time_limit, lower_bound=None, stats=None):
+    """
+    Tryb dokładny: heurystyka daje rozwiązanie początkowe, a dla
+    n <= EXACT_MAX_N programowanie dynamiczne z exact_solve dowodzi
+    optymalności w pozostałym czasie. Zwraca (sekwencja, spóźnione, certified).
+    """
+    start_time = time.monotonic()
+    if lower_bound is None:
+        lower_bound = tardy_lower_bound(n, p, d, S)
+    if n > EXACT_MAX_N:
+        solution, tardy_count = solve_instance(n, p, d, S, time_limit, lower_bound=lower_bound,
+                                               stats=stats)
+        return solution, tardy_count, tardy_count <= lower_bound
     
-    if tardy_2opt == 0:
-        return solution_2opt, tardy_2opt
+    solution, tardy_count = solve_instance(n, p, d, S, time_limit * EXACT_HEURISTIC_FRACTION,
+                                           lower_bound=lower_bound, stats=stats)
+    if tardy_count <= lower_bound:
+        return solution, tardy_count, True
     
-    # Przeszukiwanie lokalne z przesunięciami
-    remaining_time = time_limit - (time.time() - start_time)
-    if remaining_time > 0.1:
-        solution_ins, tardy_ins = insertion_local_search(
-            solution_2opt, p, d, S, time_limit, start_time
-        )
+    return exact_solve(n, p, d, S, start_time + time_limit * ILS_TIME_FRACTION, solution,
+                       lower_bound)
+
+# Budżet czasu (w sekundach) na naprawę sekwencji po nadejściu zadań
+REPLAN_BUDGET = 0.05
+
+def append_jobs(p, d, S, new_p, new_d, new_rows, new_columns):
+    """
+    Dokłada nowe zadania do instancji (numery n+1..n+K). new_rows[k] to
+    przezbrojenia z nowego zadania k do wszystkich n + K zadań, a
+    new_columns[k] przezbrojenia z n dotychczasowych zadań do zadania k.
+    Zwraca nowe (p, d, S).
+    """
+    n = len(p)
+    m = n + len(new_p)
+    if isinstance(S, SetupMatrix):
+        old = array('i')
+        old.frombytes(memoryview(S.data).tobytes())
+        rows = [old[a * n:(a + 1) * n] for a in range(n)]
+    else:
+        rows = [array('i', row) for row in S]
+    
+    buffer = array('i', bytes(4 * m * m))
+    for a in range(n):
+        buffer[a * m:a * m + n] = rows[a]
+        for k, column in enumerate(new_columns):
+            buffer[a * m + n + k] = column[a]
+    for k, row in enumerate(new_rows):
+        buffer[(n + k) * m:(n + k + 1) * m] = array('i', row)
+    return list(p) + list(new_p), list(d) + list(new_d), SetupMatrix(m, buffer)
+
+def replan(sequence, new_jobs, p, d, S, frozen=0, budget=REPLAN_BUDGET):
+    """
+    Ponowne planowanie po nadejściu zadań new_jobs (numery od 1, już
+    dołożone do p, d i S, np. przez append_jobs). Pierwsze frozen pozycji
+    sekwencji są wykonane i zostają bez zmian. Każde nowe zadanie trafia
+    na najlepszą pozycję za częścią zamrożoną (evaluate_insertions ocenia
+    wszystkie pozycje naraz), a potem przez budget sekund przesuwamy
+    spóźnione zadania sufiksu w lepsze miejsca. Zwraca (sekwencja, spóźnione).
+    """
+    deadline = time.monotonic() + budget
+    current = list(sequence)
+    
+    for job_id in new_jobs:
+        current.append(job_id)
+        scores = evaluate_insertions(current, len(current) - 1, p, d, S)
+        j = min(range(frozen, len(scores)), key=scores.__getitem__)
+        current.insert(j, current.pop())
+    
+    C, T = compute_prefix(current, p, d, S)
+    current_tardy = T[-1] if T else 0
+    
+    # Naprawa sufiksu: tylko spóźnione zadania, tylko pozycje za częścią zamrożoną
+    improved = True
+    while improved and current_tardy > 0 and time.monotonic() < deadline:
+        improved = False
+        late = [current[i] for i in range(frozen, len(current)) if C[i] > d[current[i] - 1]]
+        for job_id in late:
+            if time.monotonic() > deadline:
+                break
+            i = current.index(job_id, frozen)
+            scores = evaluate_insertions(current, i, p, d, S)
+            scores[i] = current_tardy
+            j = min(range(frozen, len(scores)), key=scores.__getitem__)
+            if scores[j] < current_tardy:
+                current.insert(j, current.pop(i))
+                current_tardy = scores[j]
+                improved = True
+        
+        if improved:
+            C, T = compute_prefix(current, p, d, S)
+    
+    return current, current_tardy
+
+# Portfel równoległych przeszukiwań: rozwiązanie startowe i kolejność
+# sąsiedztw zależą od numeru procesu
+PORTFOLIO_STARTS = ("beam", "mh", "edd", "random_edd")
+PORTFOLIO_ORDERS = ("swap", "insert")
+PORTFOLIO_SEARCH_FRACTION = 0.85
+PORTFOLIO_COLLECT_FRACTION = 0.95
+
+# Instancja przekazana raz do każdego procesu (ustawiana w inicjalizatorze)
+_worker_instance = None
+
+def stop_executor(executor):
+    """
+    Zamyka pulę procesów bez czekania na trwające zadania: procesy są
+    przerywane (terminate), więc czas zamknięcia nie zależy od nich
+    """
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+def _init_portfolio_worker(n, p, d, data, tables=None):
+    """
+    Inicjalizator procesu: odtwarza instancję z płaskiego bufora przezbrojeń
+    i tablic SetupTables policzonych raz w procesie głównym
+    """
+    global _worker_instance
+    S = SetupMatrix(n, data)
+    S.tables = tables
+    _worker_instance = (n, p, d, S)
+
+def _portfolio_task(worker, time_limit, start_time, deadline, backend, candidate_k, seed, method,
+                    lower_bound, collect_stats=False):
+    """
+    Jedno przeszukiwanie portfela na instancji z _worker_instance.
+    Zwraca (sekwencja, spóźnione, statystyki albo None).
+    """
+    n, p, d, S = _worker_instance
+    rng = random.Random(seed * 1000003 + worker)
+    start = PORTFOLIO_STARTS[worker % len(PORTFOLIO_STARTS)]
+    order = PORTFOLIO_ORDERS[worker // len(PORTFOLIO_STARTS) % len(PORTFOLIO_ORDERS)]
+    
+    if start == "beam":
+        solution = beam_search(n, p, d, S, beam_width_for(n, time_limit),
+                               deadline=start_time + time_limit * 2 * BEAM_TIME_FRACTION)
+    elif start == "mh":
+        solution = setup_moore_hodgson(n, p, d, S)
+    elif start == "edd":
+        solution = edd_heuristic(n, p, d)
+    else:
+        solution = randomized_edd(n, p, d, rng)
+    
+    if candidate_k is None and n >= CANDIDATE_MIN_N:
+        candidate_k = CANDIDATE_K
+    candidates = build_candidate_lists(S, candidate_k) if candidate_k else None
+    
+    stats = {} if collect_stats else None
+    solution, tardy = improve_solution(
+        solution, p, d, S, time_limit, deadline, backend,
+        candidates, rng, method, order, lower_bound, stats
+    )
+    return solution, tardy, stats
+
+def portfolio_solve(n, p, d, S, time_limit, workers=None, backend="python", candidate_k=None,
+                    seed=0, method="ils", lower_bound=None, stats=None):
+    """
+    Uruchamia niezależne przeszukiwania w puli procesów i zwraca najlepsze.
+    Instancja trafia do procesów raz, przez inicjalizator puli; zadania
+    dostają tylko numer procesu i terminy. Terminy liczone są zegarem
+    time.monotonic, wspólnym dla procesów na jednej maszynie, więc
+    statystyki procesów (fazy z numerem procesu i punkty osi czasu)
+    można złączyć w jednym słowniku stats.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if lower_bound is None:
+        lower_bound = tardy_lower_bound(n, p, d, S)
+    if workers <= 1 or method == "memetic":
+        # Algorytm memetyczny sam rozdziela ocenę potomków między procesy
+        return solve_instance(n, p, d, S, time_limit, backend, candidate_k, seed, method,
+                              lower_bound, workers=workers, stats=stats)
+    
+    start_time = time.monotonic()
+    deadline = start_time + time_limit * PORTFOLIO_SEARCH_FRACTION
+    collect_deadline = start_time + time_limit * PORTFOLIO_COLLECT_FRACTION
+    
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_portfolio_worker,
+        initargs=(n, p, d, S.data, S.tables)
+    )
+    try:
+        futures = [
+            executor.submit(_portfolio_task, worker, time_limit, start_time, deadline,
+                            backend, candidate_k, seed, method, lower_bound, stats is not None)
+            for worker in range(workers)
+        ]
+        
+        # Rozwiązanie zapasowe liczone w tym czasie w procesie głównym
+        best_solution = setup_moore_hodgson(n, p, d, S)
+        best_tardy = calculate_tardy_jobs(best_solution, p, d, S)
+        record_best(stats, best_tardy)
         
-        if tardy_ins < tardy_2opt:
-            return solution_ins, tardy_ins
+        done, _ = wait(futures, timeout=max(0.0, collect_deadline - time.monotonic()))
+        for worker, future in enumerate(futures):
+            if future not in done or future.exception() is not None:
+                continue
+            solution, tardy, worker_stats = future.result()
+            if worker_stats is not None:
+                for phase in worker_stats.get("phases", []):
+                    stats.setdefault("phases", []).append(dict(phase, worker=worker))
+                stats.setdefault("timeline", []).extend(worker_stats.get("timeline", []))
+            if tardy < best_tardy:
+                best_solution, best_tardy = solution, tardy
+    finally:
+        # Nie czekaj na procesy, które przekroczyły termin zbierania
+        stop_executor(executor)
     
-    return solution_2opt, tardy_2opt
+    return best_solution, best_tardy
 
 def write_solution(filename, tardy_count, sequence):
     """Zapisuje rozwiązanie do pliku"""
@@ -202,24 +2455,62 @@ def write_solution(filename, tardy_count, sequence):
         f.write(" ".join(map(str, sequence)) + "\n")
 
 def main():
-    if len(sys.argv) != 4:
-        print("Użycie: python algorithm_158740.py input_file output_file time_limit")
+    # Opcje w postaci --nazwa=wartość, pozostałe argumenty jak dotąd
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+    
+    if (len(args) != 3 or options.get("method", "ils") not in ("ils", "tabu", "memetic", "exact")
+            or not options.get("workers", "1").isdigit()):
+        print("Użycie: python algorithm_158740.py input_file output_file time_limit "
+              "[--method=ils|tabu|memetic|exact] [--workers=K] [--stats[=plik.json]]")
         sys.exit(1)
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    time_limit = float(sys.argv[3])
+    input_file = args[0]
+    output_file = args[1]
+    time_limit = float(args[2])
+    
+    # --stats zbiera statystyki przeszukiwania (JSON na stderr albo do pliku)
+    stats = {} if "stats" in options else None
+    start_time = time.monotonic()
     
     # Wczytaj instancję
     n, p, d, S = read_instance(input_file)
+    precompute_setups(S)
+    read_time = time.monotonic()
+    
+    # Dolne ograniczenie pozwala skończyć wcześniej i ocenić lukę
+    lower_bound = tardy_lower_bound(n, p, d, S)
+    bound_time = time.monotonic()
     
     # Rozwiąż
-    solution, tardy_count = solve_instance(n, p, d, S, time_limit)
+    certified = False
+    if options.get("method") == "exact":
+        solution, tardy_count, certified = solve_exact(n, p, d, S, time_limit, lower_bound, stats)
+    else:
+        # --workers=0 oznacza wszystkie rdzenie
+        workers = int(options.get("workers", "1")) or None
+        solution, tardy_count = portfolio_solve(n, p, d, S, time_limit, workers,
+                                                method=options.get("method", "ils"),
+                                                lower_bound=lower_bound, stats=stats)
+        certified = tardy_count <= lower_bound
     
     # Zapisz rezultat
     write_solution(output_file, tardy_count, solution)
     
-    print(f"Zrobione: {tardy_count} spóźnionych zadań")
+    if stats is not None:
+        stats.update(n=n, tardy=tardy_count, lower_bound=lower_bound,
+                     read_seconds=round(read_time - start_time, 4),
+                     bound_seconds=round(bound_time - read_time, 4),
+                     total_seconds=round(time.monotonic() - start_time, 4))
+        report = json.dumps(summarize_stats(stats, start_time), indent=1)
+        if options["stats"]:
+            with open(options["stats"], 'w') as f:
+                f.write(report + "\n")
+        else:
+            print(report, file=sys.stderr)
+    
+    print(f"Zrobione: {tardy_count} spóźnionych zadań" + (" (optimum)" if certified else
+          f" (dolne ograniczenie: {lower_bound}, luka: {tardy_count - lower_bound})"))
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,22 @@
+import argparse
 import random
 import os
 
+try:
+    import numpy as np
+except ImportError:  # NumPy potrzebny tylko dla generatora strumieniowego
+    np = None
+
 STUDENT_ID = "158740"
 
+# Rodziny macierzy przezbrojeń generatora strumieniowego
+SETUP_FAMILIES = ("uniform", "clustered", "triangle")
+
+# Ile liczb macierzy przezbrojeń generujemy i zapisujemy naraz
+STREAM_BLOCK = 1 << 22
+
 #out_nm-albumu-programu_nr-albumu-instancji_rozmiar.txt
-def generate_and_save_instance(n, output_dir="instances"):
+def generate_and_save_instance(n, output_dir="instances", tightness=0.7):
     random.seed(n)  # dla powtarzalności
 
     # Generacja pj (czasy wykonania: 1-100)
@@ -12,7 +24,7 @@ def generate_and_save_instance(n, output_dir="instances"):
 
     # Generacja dj (deadliny)
     total_time = sum(p)
-    max_deadline = int(total_time * 0.7)
+    max_deadline = int(total_time * tightness)
     d = [random.randint(p[i], max(p[i] + 1, max_deadline)) for i in range(n)]
 
     # Generacja Sij (macierz przezbrojenia)
@@ -42,11 +54,113 @@ def generate_and_save_instance(n, output_dir="instances"):
     print(f"✓ Wygenerowano: {filename}")
 
 
+def setup_rows(rng, n, start, stop, setups, features):
+    """
+    Wiersze start..stop-1 macierzy przezbrojeń jako tablica NumPy.
+    uniform: jak w generate_and_save_instance (10% zer, reszta 1-50),
+    clustered: rodziny zadań z tanimi przezbrojeniami wewnątrz (0-5)
+    i drogimi między rodzinami (20-50), triangle: odległości miejskie
+    między punktami na siatce, więc spełniają nierówność trójkąta.
+    """
+    rows = np.arange(start, stop)
+    if setups == "uniform":
+        block = rng.integers(1, 51, size=(stop - start, n))
+        block[rng.random((stop - start, n)) < 0.1] = 0
+    elif setups == "clustered":
+        same = features[rows, None] == features[None, :]
+        block = np.where(same,
+                         rng.integers(0, 6, size=(stop - start, n)),
+                         rng.integers(20, 51, size=(stop - start, n)))
+    else:
+        block = np.abs(features[rows, None, :] - features[None, :, :]).sum(axis=2)
+    block[np.arange(stop - start), rows] = 0
+    return block
+
+
+def format_rows(block):
+    """
+    Bajty wierszy macierzy (liczby oddzielone spacjami). Dla liczb < 100
+    znaki składane są wektorowo: dwie cyfry i separator na liczbę,
+    a zbędne zera wiodące usuwa maska.
+    """
+    if block.min() < 0 or block.max() >= 100:
+        return "".join(" ".join(map(str, row)) + "\n" for row in block.tolist()).encode("ascii")
+
+    chars = np.empty(block.shape + (3,), dtype=np.uint8)
+    chars[..., 0] = ord("0") + block // 10
+    chars[..., 1] = ord("0") + block % 10
+    chars[..., 2] = ord(" ")
+    chars[:, -1, 2] = ord("\n")
+    keep = np.ones(chars.shape, dtype=bool)
+    keep[..., 0] = block >= 10
+    return chars[keep].tobytes()
+
+
+def generate_instance_stream(n, filename, seed=None, tightness=0.7, setups="uniform"):
+    """
+    Generator dla dużych n: wektorowo (NumPy RNG z ziarnem seed) i
+    z zapisem macierzy przezbrojeń blokami wierszy, więc pamięć zależy
+    od STREAM_BLOCK, a nie od n^2. tightness to część sumy czasów
+    wykonania, do której losowane są terminy (jak 0.7 w
+    generate_and_save_instance).
+    """
+    if np is None:
+        raise RuntimeError("Generator strumieniowy wymaga pakietu NumPy")
+    if setups not in SETUP_FAMILIES:
+        raise ValueError(f"Nieznana rodzina przezbrojeń: {setups}")
+
+    rng = np.random.default_rng(n if seed is None else seed)
+
+    # Czasy wykonania 1-100 i terminy z przedziału [p, tightness * suma p]
+    p = rng.integers(1, 101, size=n)
+    max_deadline = int(p.sum() * tightness)
+    d = rng.integers(p, np.maximum(p + 1, max_deadline) + 1)
+
+    if setups == "clustered":
+        features = rng.integers(0, max(2, n // 25), size=n)
+    elif setups == "triangle":
+        features = rng.integers(0, 26, size=(n, 2))
+    else:
+        features = None
+
+    rows_per_block = max(1, STREAM_BLOCK // max(1, n))
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    with open(filename, 'wb') as f:
+        f.write(f"{n}\n".encode("ascii"))
+        f.write("".join(f"{p_j} {d_j}\n" for p_j, d_j in zip(p.tolist(), d.tolist())).encode("ascii"))
+        for start in range(0, n, rows_per_block):
+            stop = min(n, start + rows_per_block)
+            block = setup_rows(rng, n, start, stop, setups, features)
+            f.write(format_rows(block))
+
+    print(f"✓ Wygenerowano: {filename}")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generator instancji 1|Sij|ΣUj")
+    parser.add_argument("--sizes", "-n", type=str, default="50,100,150,200,250,300,350,400,450,500",
+                        help="Rozmiary instancji oddzielone przecinkami (domyślnie 50,100,...,500)")
+    parser.add_argument("--output-dir", "-o", type=str, default="instances",
+                        help="Folder na pliki (domyślnie instances)")
+    parser.add_argument("--tightness", "-t", type=float, default=0.7,
+                        help="Terminy losowane do tightness * suma p (domyślnie 0.7)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Generator strumieniowy NumPy dla dużych instancji")
+    parser.add_argument("--setups", choices=SETUP_FAMILIES, default="uniform",
+                        help="Rodzina przezbrojeń generatora strumieniowego (domyślnie uniform)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Ziarno generatora strumieniowego (domyślnie n)")
+    args = parser.parse_args()
+
     print("Generator instancji 1|Sij|ΣUj\n")
-    sizes = [50, 100, 150, 200, 250, 300, 350, 400, 450, 500]
+    sizes = [int(x.strip()) for x in args.sizes.split(",")]
 
     for n in sizes:
-        generate_and_save_instance(n)
+        if args.stream:
+            filename = os.path.join(args.output_dir, f"in_{STUDENT_ID}_{n}.txt")
+            generate_instance_stream(n, filename, args.seed, args.tightness, args.setups)
+        else:
+            generate_and_save_instance(n, args.output_dir, args.tightness)
 
-    print(f"\nGotowe! Wszystkie pliki w folderze 'instances/'")
\ No newline at end of file
+    print(f"\nGotowe! Wszystkie pliki w folderze '{args.output_dir}/'")
@@ -1,26 +1,51 @@
 import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy jest opcjonalny
+    np = None
+
+
+class SetupMatrix(list):
+    """Macierz przezbrojeń n×n w płaskim buforze int32, lista widoków wierszy"""
+    
+    def __init__(self, n, data):
+        view = memoryview(data)
+        super().__init__(view[a * n:(a + 1) * n] for a in range(n))
+        self.n = n
+        self.data = data
 
 
 def read_instance(filename):
     """Wczytuje plik z instancją"""
+    if np is not None:
+        values = np.fromfile(filename, dtype=np.int32, sep=' ')
+        n = int(values[0])
+        p = values[1:2 * n + 1:2].tolist()
+        d = values[2:2 * n + 2:2].tolist()
+        S = SetupMatrix(n, values[2 * n + 1:2 * n + 1 + n * n])
+        return n, p, d, S
+    
     with open(filename, 'r') as f:
-        lines = f.readlines()
+        data = f.read()
     
-    n = int(lines[0].strip())
+    lines = data.split('\n', 1)
+    n = int(lines[0])
+    lines = lines[1].split('\n', n)
     
     p = []
     d = []
-    for i in range(1, n + 1):
-        parts = lines[i].strip().split()
+    for i in range(n):
+        parts = lines[i].split()
         p.append(int(parts[0]))
         d.append(int(parts[1]))
     
-    S = []
-    for i in range(n + 1, 2 * n + 1):
-        row = list(map(int, lines[i].strip().split()))
-        S.append(row)
+    buffer = array('i')
+    for line in lines[n].split('\n', n - 1)[:n]:
+        buffer.extend(map(int, line.split()))
     
-    return n, p, d, S
+    return n, p, d, SetupMatrix(n, buffer)
 
 
 def read_solution(filename):
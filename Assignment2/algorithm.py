@@ -1,7 +1,28 @@
 import sys
 import time
 import random
-from copy import deepcopy
+from array import array
+
+class TaskArrays:
+    """
+    Struct-of-arrays task model. p, r and d are array('i') indexed by
+    task id (slot 0 is unused), proc[k][j] = p_j * b_k is the processing
+    time of task j on machine k (an n x m table stored by machine).
+    """
+    
+    def __init__(self, p, r, d, b):
+        self.n = len(p)
+        self.p = array('i', [0]) + array('i', p)
+        self.r = array('i', [0]) + array('i', r)
+        self.d = array('i', [0]) + array('i', d)
+        self.proc = [array('d', [p_j * b_k for p_j in self.p]) for b_k in b]
+    
+    def __len__(self):
+        return self.n
+    
+    def ids(self):
+        """Task ids 1..n"""
+        return range(1, self.n + 1)
 
 def read_input(filename):
     """Reads input data"""
@@ -11,91 +32,290 @@ def read_input(filename):
     n = int(lines[0].strip())
     b = list(map(float, lines[1].strip().split()))
     
-    tasks = []
+    p = []
+    r = []
+    d = []
     for i in range(n):
         parts = lines[i + 2].strip().split()
-        p_j = int(parts[0])
-        r_j = int(parts[1])
-        d_j = int(parts[2])
-        tasks.append({'id': i + 1, 'p': p_j, 'r': r_j, 'd': d_j})
+        p.append(int(parts[0]))
+        r.append(int(parts[1]))
+        d.append(int(parts[2]))
     
-    return n, b, tasks
+    return n, b, TaskArrays(p, r, d, b)
 
-def calculate_early_work(C_j, p_j, d_j, b_k):
-    """Calculates early work X_j considering machine speed coefficient"""
-    early_part = max(d_j - C_j + p_j * b_k, 0)
-    return min(early_part, p_j * b_k)
+def calculate_early_work(C_j, actual_p_j, d_j):
+    """Calculates early work X_j, actual_p_j = p_j * b_k is the processing time on the machine"""
+    early_part = max(d_j - C_j + actual_p_j, 0)
+    return min(early_part, actual_p_j)
 
 def calculate_criterion(schedules, b, tasks):
     """Calculates criterion value ∑X_j"""
-    task_dict = {task['id']: task for task in tasks}
     total_early_work = 0.0
     
     for machine_idx, schedule in enumerate(schedules):
-        current_time = 0.0
-        speed_factor = b[machine_idx]
-        
-        for task_id in schedule:
-            if task_id not in task_dict:
-                continue
-            
-            task = task_dict[task_id]
-            p_j = task['p']
-            r_j = task['r']
-            d_j = task['d']
-            
-            actual_p_j = p_j * speed_factor
-            start_time = max(current_time, r_j)
-            completion_time = start_time + actual_p_j
-            
-            X_j = calculate_early_work(completion_time, p_j, d_j, speed_factor)
-            total_early_work += X_j
-            
-            current_time = completion_time
+        total_early_work += simulate_machine(schedule, machine_idx, tasks)[0]
     
     return total_early_work
 
-def calculate_machine_completion_time(schedule, machine_idx, b, task_dict):
+def calculate_machine_completion_time(schedule, machine_idx, tasks):
     """Calculates completion time for given machine"""
     current_time = 0.0
-    speed_factor = b[machine_idx]
+    proc = tasks.proc[machine_idx]
+    r = tasks.r
     
     for task_id in schedule:
-        task = task_dict[task_id]
-        actual_p_j = task['p'] * speed_factor
-        start_time = max(current_time, task['r'])
-        current_time = start_time + actual_p_j
+        current_time = max(current_time, r[task_id]) + proc[task_id]
     
     return current_time
 
+def simulate_machine(schedule, machine_idx, tasks):
+    """Simulates one machine, returns (early work, completion time of each position)"""
+    proc = tasks.proc[machine_idx]
+    r = tasks.r
+    d = tasks.d
+    current_time = 0.0
+    early_work = 0.0
+    completions = []
+    
+    for task_id in schedule:
+        actual_p_j = proc[task_id]
+        release = r[task_id]
+        current_time = (release if release > current_time else current_time) + actual_p_j
+        early_part = d[task_id] - current_time + actual_p_j
+        if early_part >= actual_p_j:
+            early_work += actual_p_j
+        elif early_part > 0:
+            early_work += early_part
+        completions.append(current_time)
+    
+    return early_work, completions
+
+def apply_move(schedules, move):
+    """
+    Applies a move in place. Moves are tuples:
+    ('relocate', from_m, i, to_m, j) - task at position i of from_m goes to position j of to_m
+    ('swap', m1, i, m2, j) - tasks at m1[i] and m2[j] exchange places
+    ('adjacent', m, i) - tasks at positions i and i+1 of machine m exchange places
+    """
+    kind = move[0]
+    if kind == 'relocate':
+        _, from_m, i, to_m, j = move
+        schedules[to_m].insert(j, schedules[from_m].pop(i))
+    elif kind == 'swap':
+        _, m1, i, m2, j = move
+        schedules[m1][i], schedules[m2][j] = schedules[m2][j], schedules[m1][i]
+    else:
+        _, m, i = move
+        schedules[m][i], schedules[m][i + 1] = schedules[m][i + 1], schedules[m][i]
+
+def undo_move(schedules, move):
+    """Reverts apply_move exactly, without copying the schedule"""
+    if move[0] == 'relocate':
+        _, from_m, i, to_m, j = move
+        schedules[from_m].insert(i, schedules[to_m].pop(j))
+    else:
+        # Swaps are their own inverse
+        apply_move(schedules, move)
+
+def move_ranges(move):
+    """
+    Changed part of each machine touched by a move, as {machine: (lo, hi, offset)}:
+    positions lo..hi of the new sequence are new, earlier positions are
+    unchanged and a later position k holds the task from old position k - offset
+    """
+    kind = move[0]
+    if kind == 'adjacent':
+        _, m, i = move
+        return {m: (i, i + 1, 0)}
+    _, m1, i, m2, j = move
+    if m1 == m2:
+        return {m1: (min(i, j), max(i, j), 0)}
+    if kind == 'swap':
+        return {m1: (i, i, 0), m2: (j, j, 0)}
+    return {m1: (i, i - 1, -1), m2: (j, j, 1)}
+
+class EvaluationState:
+    """
+    Cached evaluation of a schedule: completion times and prefix sums of
+    early work of every machine. A move is applied in place and changes
+    one or two machines. Only their changed part is re-simulated: the
+    prefix is taken from the cache, and after the changed positions the
+    simulation stops as soon as a completion time equals the cached one
+    (the shift was absorbed by idle time before a release date), since
+    from there on the schedule is the same as before. The criterion
+    delta is returned and the move is then accepted or rejected (undone).
+    """
+    
+    def __init__(self, schedules, b, tasks):
+        self.schedules = schedules
+        self.tasks = tasks
+        self.completions = [[] for _ in schedules]
+        # prefix_early[m][k] = early work of the first k tasks on machine m
+        self.prefix_early = [[0.0] for _ in schedules]
+        for machine_idx, schedule in enumerate(schedules):
+            self.pending = None, {machine_idx: self.resimulate(machine_idx, 0, len(schedule), 0)}
+            self.accept()
+    
+    @property
+    def value(self):
+        """Criterion value ∑X_j of the cached schedule"""
+        return sum(prefix[-1] for prefix in self.prefix_early)
+    
+    def resimulate(self, machine_idx, lo, hi, offset):
+        """
+        Simulates the new sequence of a machine from position lo (see move_ranges).
+        Returns (early work, lo, new completions, new prefix sums, resume), where
+        resume = (k, t) means that position k matches old position t and
+        everything from there on is taken from the cache.
+        """
+        schedule = self.schedules[machine_idx]
+        completions = self.completions[machine_idx]
+        prefix_early = self.prefix_early[machine_idx]
+        proc = self.tasks.proc[machine_idx]
+        r = self.tasks.r
+        d = self.tasks.d
+        
+        current_time = completions[lo - 1] if lo > 0 else 0.0
+        early_work = prefix_early[lo]
+        new_completions = []
+        new_prefix = []
+        
+        for k in range(lo, len(schedule)):
+            task_id = schedule[k]
+            actual_p_j = proc[task_id]
+            release = r[task_id]
+            current_time = (release if release > current_time else current_time) + actual_p_j
+            
+            # Same task and completion as before: the rest is unchanged
+            if k > hi and current_time == completions[k - offset]:
+                t = k - offset
+                return (early_work + prefix_early[-1] - prefix_early[t], lo,
+                        new_completions, new_prefix, (k, t))
+            
+            early_part = d[task_id] - current_time + actual_p_j
+            if early_part >= actual_p_j:
+                early_work += actual_p_j
+            elif early_part > 0:
+                early_work += early_part
+            new_completions.append(current_time)
+            new_prefix.append(early_work)
+        
+        return early_work, lo, new_completions, new_prefix, None
+    
+    def shifted_tail_delta(self, machine_idx, k, current_time):
+        """
+        Early work change of positions k.. of a machine when the task before
+        them completes at current_time instead of the cached time. Stops
+        when a completion time equals the cached one (shift absorbed).
+        """
+        schedule = self.schedules[machine_idx]
+        completions = self.completions[machine_idx]
+        prefix_early = self.prefix_early[machine_idx]
+        proc = self.tasks.proc[machine_idx]
+        r = self.tasks.r
+        d = self.tasks.d
+        delta = 0.0
+        
+        for q in range(k, len(schedule)):
+            task_id = schedule[q]
+            actual_p_j = proc[task_id]
+            release = r[task_id]
+            current_time = (release if release > current_time else current_time) + actual_p_j
+            if current_time == completions[q]:
+                break
+            early_part = d[task_id] - current_time + actual_p_j
+            early_work = actual_p_j if early_part >= actual_p_j else (early_part if early_part > 0 else 0)
+            delta += early_work - (prefix_early[q + 1] - prefix_early[q])
+        
+        return delta
+    
+    def removal_delta(self, machine_idx, i):
+        """Criterion delta of removing the task at position i of a machine"""
+        prefix_early = self.prefix_early[machine_idx]
+        before = self.completions[machine_idx][i - 1] if i > 0 else 0.0
+        return (self.shifted_tail_delta(machine_idx, i + 1, before)
+                - (prefix_early[i + 1] - prefix_early[i]))
+    
+    def insertion_deltas(self, machine_idx, task_id, threshold=-float('inf')):
+        """
+        Yields (position, criterion delta) of inserting a task at every
+        position of a machine. The task's completion comes from the cached
+        completion times in O(1) per position, but the tail effect of each
+        placement is re-simulated by shifted_tail_delta until idle time
+        absorbs the shift, so a machine without idle time costs O(len^2).
+        The task's own early work can only fall with the position and the
+        tasks after it are only delayed, so the sweep stops once that
+        early work is not above threshold.
+        """
+        completions = self.completions[machine_idx]
+        actual_p_j = self.tasks.proc[machine_idx][task_id]
+        r_j = self.tasks.r[task_id]
+        d_j = self.tasks.d[task_id]
+        
+        for j in range(len(completions) + 1):
+            before = completions[j - 1] if j > 0 else 0.0
+            completion = max(before, r_j) + actual_p_j
+            early_work = calculate_early_work(completion, actual_p_j, d_j)
+            if early_work <= threshold:
+                return
+            yield j, early_work + self.shifted_tail_delta(machine_idx, j, completion)
+    
+    def try_move(self, move):
+        """Applies a move in place and returns the criterion delta"""
+        apply_move(self.schedules, move)
+        self.pending = move, {
+            machine_idx: self.resimulate(machine_idx, lo, hi, offset)
+            for machine_idx, (lo, hi, offset) in move_ranges(move).items()
+        }
+        return sum(result[0] - self.prefix_early[machine_idx][-1]
+                   for machine_idx, result in self.pending[1].items())
+    
+    def accept(self):
+        """Keeps the last tried move and updates the cache"""
+        for machine_idx, (_, lo, new_completions, new_prefix, resume) in self.pending[1].items():
+            completions = self.completions[machine_idx]
+            prefix_early = self.prefix_early[machine_idx]
+            tail_completions = []
+            tail_prefix = []
+            if resume is not None:
+                # Cached tail, its prefix sums moved to the new early work before it
+                k, t = resume
+                base = new_prefix[-1] if new_prefix else prefix_early[lo]
+                tail_completions = completions[t:]
+                tail_prefix = [base + value - prefix_early[t] for value in prefix_early[t + 1:]]
+            self.completions[machine_idx] = completions[:lo] + new_completions + tail_completions
+            self.prefix_early[machine_idx] = prefix_early[:lo + 1] + new_prefix + tail_prefix
+    
+    def reject(self):
+        """Undoes the last tried move"""
+        undo_move(self.schedules, self.pending[0])
+
 def greedy_edf_algorithm(n, b, tasks):
     """
     Earliest Deadline First with intelligent machine selection
     """
     schedules = [[] for _ in range(5)]
     machine_times = [0.0] * 5
-    task_dict = {task['id']: task for task in tasks}
+    p, r, d, proc = tasks.p, tasks.r, tasks.d, tasks.proc
     
     # Sort by deadline, then by ready time
-    sorted_tasks = sorted(tasks, key=lambda t: (t['d'], t['r'], -t['p']))
+    sorted_tasks = sorted(tasks.ids(), key=lambda j: (d[j], r[j], -p[j]))
     
-    for task in sorted_tasks:
-        task_id = task['id']
-        p_j = task['p']
-        r_j = task['r']
-        d_j = task['d']
+    for task_id in sorted_tasks:
+        r_j = r[task_id]
+        d_j = d[task_id]
         
         best_machine = -1
         best_score = -float('inf')
         
         for machine_idx in range(5):
             speed_factor = b[machine_idx]
-            actual_p_j = p_j * speed_factor
+            actual_p_j = proc[machine_idx][task_id]
             
             start = max(machine_times[machine_idx], r_j)
             completion = start + actual_p_j
             
-            early_work = calculate_early_work(completion, p_j, d_j, speed_factor)
+            early_work = calculate_early_work(completion, actual_p_j, d_j)
             
             # Score prefers: high early work, fast machines, low load
             score = (early_work * 100 
@@ -107,10 +327,8 @@ def greedy_edf_algorithm(n, b, tasks):
                 best_machine = machine_idx
         
         schedules[best_machine].append(task_id)
-        speed_factor = b[best_machine]
-        actual_p_j = p_j * speed_factor
         start = max(machine_times[best_machine], r_j)
-        machine_times[best_machine] = start + actual_p_j
+        machine_times[best_machine] = start + proc[best_machine][task_id]
     
     return schedules
 
@@ -120,31 +338,30 @@ def greedy_slack_algorithm(n, b, tasks):
     """
     schedules = [[] for _ in range(5)]
     machine_times = [0.0] * 5
+    p, r, d, proc = tasks.p, tasks.r, tasks.d, tasks.proc
     
     # Sort by slack time (smaller slack = higher priority)
-    def slack_priority(task):
-        slack = task['d'] - task['r'] - task['p']
-        return (slack, task['d'], -task['p'])
+    def slack_priority(j):
+        slack = d[j] - r[j] - p[j]
+        return (slack, d[j], -p[j])
     
-    sorted_tasks = sorted(tasks, key=slack_priority)
+    sorted_tasks = sorted(tasks.ids(), key=slack_priority)
     
-    for task in sorted_tasks:
-        task_id = task['id']
-        p_j = task['p']
-        r_j = task['r']
-        d_j = task['d']
+    for task_id in sorted_tasks:
+        r_j = r[task_id]
+        d_j = d[task_id]
         
         best_machine = -1
         best_early_work = -float('inf')
         
         for machine_idx in range(5):
             speed_factor = b[machine_idx]
-            actual_p_j = p_j * speed_factor
+            actual_p_j = proc[machine_idx][task_id]
             
             start = max(machine_times[machine_idx], r_j)
             completion = start + actual_p_j
             
-            early_work = calculate_early_work(completion, p_j, d_j, speed_factor)
+            early_work = calculate_early_work(completion, actual_p_j, d_j)
             
             # Prefer faster machines for tasks with small slack
             adjusted_early_work = early_work / (speed_factor ** 0.5)
@@ -157,10 +374,8 @@ def greedy_slack_algorithm(n, b, tasks):
             best_machine = 0
         
         schedules[best_machine].append(task_id)
-        speed_factor = b[best_machine]
-        actual_p_j = p_j * speed_factor
         start = max(machine_times[best_machine], r_j)
-        machine_times[best_machine] = start + actual_p_j
+        machine_times[best_machine] = start + proc[best_machine][task_id]
     
     return schedules
 
@@ -170,27 +385,25 @@ def lpt_algorithm(n, b, tasks):
     """
     schedules = [[] for _ in range(5)]
     machine_times = [0.0] * 5
+    p, r, d, proc = tasks.p, tasks.r, tasks.d, tasks.proc
     
     # Sort from longest tasks
-    sorted_tasks = sorted(tasks, key=lambda t: (-t['p'], t['d']))
+    sorted_tasks = sorted(tasks.ids(), key=lambda j: (-p[j], d[j]))
     
-    for task in sorted_tasks:
-        task_id = task['id']
-        p_j = task['p']
-        r_j = task['r']
-        d_j = task['d']
+    for task_id in sorted_tasks:
+        r_j = r[task_id]
+        d_j = d[task_id]
         
         best_machine = -1
         best_score = -float('inf')
         
         for machine_idx in range(5):
-            speed_factor = b[machine_idx]
-            actual_p_j = p_j * speed_factor
+            actual_p_j = proc[machine_idx][task_id]
             
             start = max(machine_times[machine_idx], r_j)
             completion = start + actual_p_j
             
-            early_work = calculate_early_work(completion, p_j, d_j, speed_factor)
+            early_work = calculate_early_work(completion, actual_p_j, d_j)
             
             # For LPT: balance machine load
             score = early_work * 50 - machine_times[machine_idx]
@@ -200,56 +413,61 @@ def lpt_algorithm(n, b, tasks):
                 best_machine = machine_idx
         
         schedules[best_machine].append(task_id)
-        speed_factor = b[best_machine]
-        actual_p_j = p_j * speed_factor
         start = max(machine_times[best_machine], r_j)
-        machine_times[best_machine] = start + actual_p_j
+        machine_times[best_machine] = start + proc[best_machine][task_id]
     
     return schedules
 
-def local_search_swap(schedules, b, tasks, time_limit, start_time):
+def local_search_swap(schedules, b, tasks, time_limit, start_time, first_improvement=False):
     """
-    Local search: swap tasks between machines
+    Local search: move tasks between machines. Each task is tried at every
+    position of every other machine (EvaluationState.insertion_deltas) and
+    goes to the best placement, or to the first improving one when
+    first_improvement is set. One task can cost O(n^2) without pruning,
+    so the time limit is checked before each task.
     """
-    task_dict = {task['id']: task for task in tasks}
+    schedules = [schedule[:] for schedule in schedules]
+    state = EvaluationState(schedules, b, tasks)
     improved = True
     iterations = 0
     
     while improved and time.time() - start_time < time_limit * 0.85:
         improved = False
         iterations += 1
-        current_value = calculate_criterion(schedules, b, tasks)
         
-        # Try to swap each task
         for from_m in range(5):
             if time.time() - start_time > time_limit * 0.85:
                 break
             
-            for i in range(len(schedules[from_m])):
+            i = 0
+            while i < len(schedules[from_m]):
+                # One task costs a sweep over every other machine, so check per task
+                if time.time() - start_time > time_limit * 0.85:
+                    break
                 task_id = schedules[from_m][i]
+                removal = state.removal_delta(from_m, i)
+                best_move = None
+                best_delta = 0.01
                 
                 for to_m in range(5):
-                    if from_m == to_m:
+                    if to_m == from_m:
                         continue
-                    
-                    # Move task
-                    test_schedules = deepcopy(schedules)
-                    test_schedules[from_m].pop(i)
-                    test_schedules[to_m].append(task_id)
-                    
-                    new_value = calculate_criterion(test_schedules, b, tasks)
-                    
-                    if new_value > current_value + 0.01:
-                        schedules = test_schedules
-                        current_value = new_value
-                        improved = True
+                    # Placements that cannot beat best_delta are cut off by the sweep
+                    for j, delta in state.insertion_deltas(to_m, task_id, best_delta - removal):
+                        if removal + delta > best_delta:
+                            best_move = ('relocate', from_m, i, to_m, j)
+                            best_delta = removal + delta
+                            if first_improvement:
+                                break
+                    if first_improvement and best_move is not None:
                         break
                 
-                if improved:
-                    break
-            
-            if improved:
-                break
+                if best_move is not None:
+                    state.try_move(best_move)
+                    state.accept()
+                    improved = True
+                else:
+                    i += 1
     
     return schedules
 
@@ -257,7 +475,8 @@ def local_search_reorder(schedules, b, tasks, time_limit, start_time):
     """
     Local search: change task order on the same machine
     """
-    task_dict = {task['id']: task for task in tasks}
+    schedules = [schedule[:] for schedule in schedules]
+    state = EvaluationState(schedules, b, tasks)
     improved = True
     iterations = 0
     max_iterations = 50
@@ -265,7 +484,6 @@ def local_search_reorder(schedules, b, tasks, time_limit, start_time):
     while improved and iterations < max_iterations and time.time() - start_time < time_limit * 0.9:
         improved = False
         iterations += 1
-        current_value = calculate_criterion(schedules, b, tasks)
         
         for machine_idx in range(5):
             if time.time() - start_time > time_limit * 0.9:
@@ -277,18 +495,14 @@ def local_search_reorder(schedules, b, tasks, time_limit, start_time):
             
             # Try to swap adjacent tasks
             for i in range(len(schedule) - 1):
-                test_schedules = deepcopy(schedules)
                 # Swap positions i and i+1
-                test_schedules[machine_idx][i], test_schedules[machine_idx][i+1] = \
-                    test_schedules[machine_idx][i+1], test_schedules[machine_idx][i]
-                
-                new_value = calculate_criterion(test_schedules, b, tasks)
+                delta = state.try_move(('adjacent', machine_idx, i))
                 
-                if new_value > current_value + 0.01:
-                    schedules = test_schedules
-                    current_value = new_value
+                if delta > 0.01:
+                    state.accept()
                     improved = True
                     break
+                state.reject()
             
             if improved:
                 break
@@ -299,11 +513,11 @@ def simulated_annealing(schedules, b, tasks, time_limit, start_time):
     """
     Simulated annealing - allows temporary solution degradation
     """
-    task_dict = {task['id']: task for task in tasks}
-    current_schedules = deepcopy(schedules)
-    best_schedules = deepcopy(schedules)
+    current_schedules = [schedule[:] for schedule in schedules]
+    best_schedules = [schedule[:] for schedule in schedules]
+    state = EvaluationState(current_schedules, b, tasks)
     
-    current_value = calculate_criterion(current_schedules, b, tasks)
+    current_value = state.value
     best_value = current_value
     
     temperature = 100.0
@@ -314,37 +528,43 @@ def simulated_annealing(schedules, b, tasks, time_limit, start_time):
     while iterations < max_iterations and time.time() - start_time < time_limit * 0.95:
         iterations += 1
         
-        # Random modification
-        test_schedules = deepcopy(current_schedules)
+        # Random modification, applied in place
+        move = None
         
         if random.random() < 0.5:
-            # Move random task to another machine
+            # Move random task to a random position on another machine
+            # or exchange it with a task there
             from_m = random.randint(0, 4)
-            if len(test_schedules[from_m]) > 0:
+            if len(current_schedules[from_m]) > 0:
                 to_m = random.randint(0, 4)
                 if from_m != to_m:
-                    task_idx = random.randint(0, len(test_schedules[from_m]) - 1)
-                    task_id = test_schedules[from_m].pop(task_idx)
-                    test_schedules[to_m].append(task_id)
+                    task_idx = random.randint(0, len(current_schedules[from_m]) - 1)
+                    j = random.randint(0, len(current_schedules[to_m]))
+                    if j < len(current_schedules[to_m]) and random.random() < 0.5:
+                        move = ('swap', from_m, task_idx, to_m, j)
+                    else:
+                        move = ('relocate', from_m, task_idx, to_m, j)
         else:
             # Swap order on random machine
             machine_idx = random.randint(0, 4)
-            if len(test_schedules[machine_idx]) >= 2:
-                i = random.randint(0, len(test_schedules[machine_idx]) - 2)
-                test_schedules[machine_idx][i], test_schedules[machine_idx][i+1] = \
-                    test_schedules[machine_idx][i+1], test_schedules[machine_idx][i]
+            if len(current_schedules[machine_idx]) >= 2:
+                i = random.randint(0, len(current_schedules[machine_idx]) - 2)
+                move = ('adjacent', machine_idx, i)
         
-        new_value = calculate_criterion(test_schedules, b, tasks)
-        delta = new_value - current_value
+        delta = state.try_move(move) if move is not None else 0.0
         
         # Accept if better, or with certain probability if worse
         if delta > 0 or random.random() < min(1.0, 2.71828 ** (delta / temperature)):
-            current_schedules = test_schedules
-            current_value = new_value
+            if move is not None:
+                state.accept()
+            current_value = state.value
             
+            # Snapshot only when a new best is found
             if current_value > best_value:
-                best_schedules = deepcopy(current_schedules)
+                best_schedules = [schedule[:] for schedule in current_schedules]
                 best_value = current_value
+        elif move is not None:
+            state.reject()
         
         temperature *= cooling_rate
     
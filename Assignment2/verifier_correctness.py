@@ -1,22 +1,28 @@
 import sys
+from array import array
 
 def read_input(input_file):
-    """Reads input data"""
+    """
+    Reads input data as parallel arrays indexed by task id (slot 0 unused):
+    r, d and proc[k][j] = p_j * b_k, the processing time on machine k
+    """
     with open(input_file, 'r') as f:
         lines = f.readlines()
     
     n = int(lines[0].strip())
     b = list(map(float, lines[1].strip().split()))
     
-    tasks = []
+    p = array('i', [0])
+    r = array('i', [0])
+    d = array('i', [0])
     for i in range(2, n + 2):
         parts = lines[i].strip().split()
-        p_j = int(parts[0])
-        r_j = int(parts[1])
-        d_j = int(parts[2])
-        tasks.append((p_j, r_j, d_j))
+        p.append(int(parts[0]))
+        r.append(int(parts[1]))
+        d.append(int(parts[2]))
     
-    return n, b, tasks
+    proc = [array('d', [p_j * b_k for p_j in p]) for b_k in b]
+    return n, b, (r, d, proc)
 
 def read_output(output_file):
     """Reads solution"""
@@ -39,7 +45,7 @@ def read_output(output_file):
 def validate_solution(input_file, output_file):
     """Validates solution correctness"""
     try:
-        n, b, tasks = read_input(input_file)
+        n, b, (r, d, proc) = read_input(input_file)
         criterion_value, schedules = read_output(output_file)
         
         # Check if each task appears exactly once
@@ -58,22 +64,19 @@ def validate_solution(input_file, output_file):
         
         for machine_idx, schedule in enumerate(schedules):
             current_time = 0.0
-            speed_factor = b[machine_idx]
+            machine_proc = proc[machine_idx]
             
             for task_id in schedule:
-                task_idx = task_id - 1
-                p_j, r_j, d_j = tasks[task_idx]
-                
                 # Actual processing time on this machine
-                actual_p_j = p_j * speed_factor
+                actual_p_j = machine_proc[task_id]
                 
                 # Task cannot start before r_j
-                start_time = max(current_time, r_j)
+                start_time = max(current_time, r[task_id])
                 completion_time = start_time + actual_p_j
                 
                 # Calculate X_j = min{max{d_j - C_j + p_j * b_k, 0}, p_j * b_k}
-                early_part = max(d_j - completion_time + p_j * speed_factor, 0)
-                X_j = min(early_part, p_j * speed_factor)
+                early_part = max(d[task_id] - completion_time + actual_p_j, 0)
+                X_j = min(early_part, actual_p_j)
                 
                 total_early_work += X_j
                 current_time = completion_time